@@ -1,27 +1,42 @@
 from mcp.server.fastmcp import FastMCP
-import platform
-import sys
 import datetime
+import os
+import sys
+
+# metrics live in the low-level server's package — one copy for both servers
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "01-stdio-mcp-server-module"))
+from app.metrics import STATIC_INFO, monitor, read_metrics, sampling
 
 # Initialize the FastMCP server
 # "system-info" is the name of our server
-mcp = FastMCP("system-info")
+# lifespan starts the metrics sampler when the server starts running
+mcp = FastMCP("system-info", lifespan=sampling)
 
 @mcp.tool()
+@monitor.counted
 def get_system_info() -> str:
     """Returns basic system information (OS, Python version)."""
-    info = [
-        f"System: {platform.system()} {platform.release()}",
-        f"Python: {sys.version.split()[0]}",
-        f"Time: {datetime.datetime.now().isoformat()}"
-    ]
+    info = STATIC_INFO + [f"Time: {datetime.datetime.now().isoformat()}"]
     return "\n".join(info)
 
 @mcp.tool()
+@monitor.counted
 def echo(message: str) -> str:
     """Echoes back the message provided specifically for testing connection."""
     return f"Echo verified: {message}"
 
+@mcp.resource("metrics://system", mime_type="application/json")
+@monitor.counted
+async def system_metrics() -> str:
+    """CPU, RSS, event-loop lag and request rate over the last 60 seconds."""
+    return await read_metrics()
+
+@mcp.resource("metrics://system/{window}", mime_type="application/json")
+@monitor.counted
+async def system_metrics_window(window: str) -> str:
+    """The same over the last {window} seconds, or 'all' for everything buffered."""
+    return await read_metrics(window)
+
 if __name__ == "__main__":
     # fastmcp.run() handles the stdio connection automatically
     mcp.run()
@@ -0,0 +1,48 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+
+class TTLCache:
+    """Results of an async function, kept for `ttl` seconds, at most `max_entries` of them.
+
+    Concurrent `get()`s for a key that isn't cached yet share ONE computation
+    instead of each running it (request coalescing). The computation runs in
+    its own task, so a caller that gets cancelled doesn't cancel it for the
+    others waiting on it. Errors are passed to every waiter, never cached.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 128):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()      # key -> (expires_at, value), oldest first
+        self._pending: dict[Any, asyncio.Task] = {}      # key -> computation in progress
+
+    async def get(self, key, compute: Callable[[], Awaitable[Any]]):
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+
+        task = self._pending.get(key)
+        if task is None:
+            self.misses += 1
+            task = self._pending[key] = asyncio.ensure_future(self._fill(key, compute))
+        return await asyncio.shield(task)
+
+    async def _fill(self, key, compute):
+        try:
+            value = await compute()
+        finally:
+            del self._pending[key]
+        if self.ttl > 0:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
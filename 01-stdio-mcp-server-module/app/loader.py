@@ -0,0 +1,115 @@
+import re
+
+from mcp.server import Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.types import Tool, TextContent, Resource, ResourceTemplate, Prompt, PromptArgument, GetPromptResult
+
+from app import manifest
+from app.cache import TTLCache
+from app.prompt import compile_prompt
+from app.registry import ToolRegistry, load
+
+# --- Registration (from app/manifest.py — no tool/resource module is imported here) ---
+
+def register_tools(server: Server) -> ToolRegistry:
+    registry = ToolRegistry()
+    for spec in manifest.TOOLS:
+        registry.add(spec["name"], spec["description"], spec.get("schema"), spec["target"],
+                     concurrency=spec.get("concurrency"), queue=spec.get("queue"),
+                     timeout=spec.get("timeout"))
+
+    @server.list_tools()    
+    async def handle_tool_list() -> list[Tool]:
+        return registry.tools          # built once, at startup
+
+
+    # validate_input=False: the SDK would run a full jsonschema.validate (schema
+    # check included) on every call; the registry's compiled validators do it instead.
+    @server.call_tool(validate_input=False)
+    async def handle_call_tool(name: str, arguments: dict | None) -> list[TextContent]:
+        return await registry.dispatch(name, arguments or {})
+
+    return registry
+
+
+def _template_pattern(uri_template: str) -> re.Pattern:
+    """info://system/config/{key} -> ^info://system/config/(?P<key>[^/]+)$"""
+    parts = re.split(r"\{(\w+)\}", uri_template)
+    regex = "".join(re.escape(part) if i % 2 == 0 else f"(?P<{part}>[^/]+)"
+                    for i, part in enumerate(parts))
+    return re.compile(f"^{regex}$")
+
+
+def _resource_cache(spec: dict) -> TTLCache:
+    return TTLCache(spec.get("ttl", 0), spec.get("max_entries", 1))
+
+
+def register_resources(server: Server):
+    # uri -> (spec, cache); templates are tried in order when no exact URI matches
+    RESOURCE_MAP = {spec["uri"]: (spec, _resource_cache(spec)) for spec in manifest.RESOURCES}
+    TEMPLATES = [(_template_pattern(spec["uri_template"]), spec, _resource_cache(spec))
+                 for spec in manifest.RESOURCE_TEMPLATES]
+
+    resources = [Resource(uri=spec["uri"], name=spec["name"], mimeType=spec["mime_type"])
+                 for spec in manifest.RESOURCES]
+    templates = [ResourceTemplate(uriTemplate=spec["uri_template"], name=spec["name"],
+                                  description=spec.get("description"), mimeType=spec["mime_type"])
+                 for spec in manifest.RESOURCE_TEMPLATES]
+
+    def match(uri: str):
+        if uri in RESOURCE_MAP:
+            return *RESOURCE_MAP[uri], {}
+        for pattern, spec, cache in TEMPLATES:
+            m = pattern.match(uri)
+            if m:
+                return spec, cache, m.groupdict()
+        raise ValueError(f"Resource not found: {uri}")
+
+    @server.list_resources()
+    async def handle_list_resources() -> list[Resource]:
+        return resources
+
+    @server.list_resource_templates()
+    async def handle_list_resource_templates() -> list[ResourceTemplate]:
+        return templates
+
+    @server.read_resource()
+    async def handle_read_resource(uri: str) -> list[ReadResourceContents]:
+        uri_str = str(uri)
+        spec, cache, params = match(uri_str)
+
+        data = await cache.get(uri_str, lambda: load(spec["target"])(**params))
+
+        return [
+            ReadResourceContents(
+                content=data,
+                mime_type=spec["mime_type"]
+            )
+        ]
+
+
+def register_prompts(server: Server):
+    prompts = [
+        Prompt(name=spec["name"], description=spec["description"], arguments=[
+            PromptArgument(name=arg["name"], description=arg.get("description"),
+                           required=arg.get("required", False))
+            for arg in spec.get("arguments", [])
+        ])
+        for spec in manifest.PROMPTS
+    ]
+    # compiled now, so a bad template (unknown placeholder, missing file) stops the server at startup
+    compiled = {spec["name"]: compile_prompt(spec) for spec in manifest.PROMPTS}
+
+    @server.list_prompts()
+    async def handle_list_prompts() -> list[Prompt]:
+        return prompts
+
+    @server.get_prompt()
+    async def handle_get_prompt(name: str, arguments: dict | None) -> GetPromptResult:
+        template = compiled.get(name)
+        if template is None:
+            raise ValueError(f"Prompt not found: {name}")
+
+        messages = template.render(arguments or {})
+        # You MUST wrap the list of messages in a GetPromptResult:
+        return GetPromptResult(messages=messages)
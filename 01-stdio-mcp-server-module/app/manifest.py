@@ -0,0 +1,128 @@
+# What the server offers, as plain data.
+# create_app() registers everything from here without importing the modules
+# that implement it; each "module:function" target is imported on first use.
+
+TWO_INTEGERS = {
+    "type": "object",
+    "properties": {
+        "a": {"type": "integer"},
+        "b": {"type": "integer"}
+    },
+    "required": ["a", "b"]
+}
+
+MAX_BATCH = 100_000     # values per array in one batch call
+
+INTEGER_ARRAY = {"type": "array", "items": {"type": "integer"}, "maxItems": MAX_BATCH}
+
+TOOLS = [
+    {
+        "name": "add_numbers",
+        "description": "Add two numbers",
+        "schema": TWO_INTEGERS,
+        "target": "app.tools:add_numbers",
+    },
+    {
+        "name": "multiply_numbers",
+        "description": "Multiply two numbers",
+        "schema": TWO_INTEGERS,
+        "target": "app.tools:mul_numbers",
+    },
+    {
+        "name": "elementwise_numbers",
+        "description": "Apply add / subtract / multiply to two equal-length integer arrays, element by element",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "op": {"type": "string", "enum": ["add", "subtract", "multiply"]},
+                "a": INTEGER_ARRAY,
+                "b": INTEGER_ARRAY
+            },
+            "required": ["op", "a", "b"]
+        },
+        "target": "app.batch:elementwise_numbers",
+    },
+    {
+        "name": "reduce_numbers",
+        "description": "Reduce an integer array to one value: sum, product, min or max",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "op": {"type": "string", "enum": ["sum", "product", "min", "max"]},
+                "values": INTEGER_ARRAY
+            },
+            "required": ["op", "values"]
+        },
+        "target": "app.batch:reduce_numbers",
+    },
+    {
+        "name": "dot_numbers",
+        "description": "Dot product of two equal-length integer arrays",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "a": INTEGER_ARRAY,
+                "b": INTEGER_ARRAY
+            },
+            "required": ["a", "b"]
+        },
+        "target": "app.batch:dot_numbers",
+    },
+    {
+        "name": "get_status",
+        "description": "Get basic details from system",
+        "target": "app.tools:sys_config",
+        "concurrency": 1,
+        "timeout": 5,
+    },
+]
+
+RESOURCES = [
+    {
+        "uri": "info://system/config",
+        "name": "System Config",
+        "mime_type": "text/plain",
+        "target": "app.resource:get_config_data",
+        "ttl": 60,                  # seconds to reuse the handler's output (0 = always call it)
+    },
+    {
+        "uri": "metrics://system",
+        "name": "System Metrics (last 60 s)",
+        "mime_type": "application/json",
+        "target": "app.metrics:read_metrics",
+    },
+]
+
+# {name} in a template matches one path segment and is passed to the handler as name=...
+RESOURCE_TEMPLATES = [
+    {
+        "uri_template": "info://system/config/{key}",
+        "name": "Config Value",
+        "description": "One value from the system config, e.g. info://system/config/version",
+        "mime_type": "text/plain",
+        "target": "app.resource:get_config_value",
+        "ttl": 60,
+        "max_entries": 32,          # distinct URIs kept (least recently used dropped first)
+    },
+    {
+        "uri_template": "metrics://system/{window}",
+        "name": "System Metrics Window",
+        "description": "CPU, RSS, event-loop lag and request rate over the last {window} seconds (or 'all')",
+        "mime_type": "application/json",
+        "target": "app.metrics:read_metrics",
+    },
+]
+
+# Template text lives in app/prompts/<template>; every {placeholder} in it must be
+# declared here. "default" is used when an optional argument isn't given.
+PROMPTS = [
+    {
+        "name": "math_expert",
+        "description": "Act like a math professor",
+        "template": "math_expert.md",
+        "arguments": [
+            {"name": "topic", "description": "What the student is working on", "default": "mathematics"},
+            {"name": "level", "description": "e.g. high school, university", "default": "university"},
+        ],
+    },
+]
@@ -0,0 +1,191 @@
+# Always-on health telemetry: a background sampler writes CPU, RSS, event-loop
+# lag and request rate into a fixed-size ring buffer once per interval.
+# Read it through the metrics://system resources (see app/manifest.py).
+# Shared with ../01-stdio-mcp-FastMCP-module, which imports this file.
+import functools
+import inspect
+import json
+import math
+import os
+import platform
+import sys
+import time
+from array import array
+from contextlib import asynccontextmanager
+
+import anyio
+
+SAMPLE_INTERVAL = float(os.environ.get("MCP_METRICS_INTERVAL", "1.0"))   # seconds
+SAMPLE_CAPACITY = int(os.environ.get("MCP_METRICS_SAMPLES", "600"))      # 10 min at 1 s
+FIELDS = ("cpu_percent", "rss_mb", "loop_lag_ms", "requests_per_s")
+
+# Facts that can't change while the process runs — computed once, at import.
+STATIC = {
+    "system": f"{platform.system()} {platform.release()}",
+    "python": sys.version.split()[0],
+    "pid": os.getpid(),
+    "started": time.time(),
+}
+STATIC_INFO = [                # the lines get_status / get_system_info print
+    f"System: {STATIC['system']}",
+    f"Python: {STATIC['python']}",
+]
+
+try:
+    import resource
+except ImportError:           # not on Windows
+    resource = None
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _rss_bytes() -> float:
+    try:
+        with open("/proc/self/statm", "rb") as f:          # Linux: current RSS
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        pass
+    if resource is not None:                               # elsewhere: peak RSS is the best we get
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return math.nan
+
+
+class RingBuffer:
+    """The last `capacity` samples, one preallocated array('d') per field.
+
+    Appending overwrites the oldest slot in place — no allocation, no growth,
+    however long the server runs.
+    """
+
+    def __init__(self, fields: tuple[str, ...], capacity: int):
+        self.fields = fields
+        self.capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._columns = {name: array("d", bytes(8 * capacity)) for name in fields}
+        self._next = 0                 # slot the next sample goes into
+        self._count = 0
+
+    def append(self, t: float, values: dict):
+        i = self._next
+        self._times[i] = t
+        for name in self.fields:
+            self._columns[name][i] = values[name]
+        self._next = (i + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def window(self, seconds: float | None = None) -> dict:
+        """Samples from the last `seconds` (all of them if None), oldest first, per field."""
+        first = (self._next - self._count) % self.capacity
+        slots = [(first + k) % self.capacity for k in range(self._count)]
+        if seconds is not None:
+            cutoff = time.time() - seconds
+            slots = [i for i in slots if self._times[i] >= cutoff]
+        series = {"t": [self._times[i] for i in slots]}
+        for name in self.fields:
+            column = self._columns[name]
+            series[name] = [column[i] for i in slots]
+        return series
+
+
+class Monitor:
+    def __init__(self, interval: float = SAMPLE_INTERVAL, capacity: int = SAMPLE_CAPACITY):
+        self.interval = interval
+        self.buffer = RingBuffer(FIELDS, capacity)
+        self.requests = 0              # bumped by every counted handler
+
+    def counted(self, fn):
+        """Decorator: every call of `fn` counts toward requests_per_s.
+
+        Keeps the signature (FastMCP builds the tool schema from it) and
+        stays sync or async like `fn`.
+        """
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                self.requests += 1
+                return await fn(*args, **kwargs)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                self.requests += 1
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def instrument(self, request_handlers: dict):
+        """Count every registered request handler of a low-level `Server`."""
+        for request_type, handler in list(request_handlers.items()):
+            request_handlers[request_type] = self.counted(handler)
+
+    async def run(self):
+        wall, cpu, seen = time.perf_counter(), time.process_time(), self.requests
+        while True:
+            await anyio.sleep(self.interval)
+            now_wall, now_cpu, now_seen = time.perf_counter(), time.process_time(), self.requests
+            elapsed = now_wall - wall
+            self.buffer.append(time.time(), {
+                "cpu_percent": 100.0 * (now_cpu - cpu) / elapsed,
+                "rss_mb": _rss_bytes() / 2**20,
+                # a busy loop wakes us late: the overshoot is how long callbacks had to wait
+                "loop_lag_ms": max(0.0, elapsed - self.interval) * 1000,
+                "requests_per_s": (now_seen - seen) / elapsed,
+            })
+            wall, cpu, seen = now_wall, now_cpu, now_seen
+
+    def report(self, seconds: float | None) -> dict:
+        series = self.buffer.window(seconds)
+        summary = {}
+        for name in FIELDS:
+            values = [v for v in series[name] if not math.isnan(v)]
+            if values:
+                summary[name] = {"min": min(values), "avg": sum(values) / len(values), "max": max(values)}
+        return {
+            "static": STATIC,
+            "uptime_s": time.time() - STATIC["started"],
+            "interval_s": self.interval,
+            "window_s": seconds,
+            "samples": len(series["t"]),
+            "summary": summary,
+            "series": series,
+        }
+
+
+monitor = Monitor()
+
+
+@asynccontextmanager
+async def sampling(server=None):
+    """Any server's lifespan: run the sampler while the server runs.
+
+    Counts nothing by itself — wrap handlers with `monitor.counted`.
+    """
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(monitor.run)
+        try:
+            yield {}
+        finally:
+            tg.cancel_scope.cancel()
+
+
+@asynccontextmanager
+async def lifespan(server):
+    """Low-level `Server` lifespan: count every request and run the sampler."""
+    monitor.instrument(server.request_handlers)
+    async with sampling(server) as state:
+        yield state
+
+
+# --- Resource handlers (metrics://system, metrics://system/{window}) ---
+
+DEFAULT_WINDOW = 60.0
+
+async def read_metrics(window: str | None = None):
+    if window is None:
+        seconds = DEFAULT_WINDOW
+    elif window == "all":
+        seconds = None
+    else:
+        try:
+            seconds = float(window)
+        except ValueError:
+            raise ValueError(f"Window must be a number of seconds or 'all', got {window!r}") from None
+    return json.dumps(monitor.report(seconds))
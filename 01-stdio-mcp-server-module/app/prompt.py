@@ -1,31 +1,64 @@
-from mcp.types import Prompt, PromptMessage, TextContent, GetPromptResult
-from mcp.server import Server
-
-async def expert_mathematician_prompt(args: dict):
-    return [
-        PromptMessage(
-            role="user",
-            content=TextContent(type="text", text="You are a math professor.")
-        )
-    ]
-
-PROMPT_MAP = {
-    "math_expert": expert_mathematician_prompt,
-}
-
-def register_prompts(server: Server):
-    @server.list_prompts()
-    async def handle_list_prompts() -> list[Prompt]:
+# Prompt template engine. Every template is compiled at startup by
+# app/loader.py (names and declared arguments live in app/manifest.py,
+# template text in app/prompts/).
+import os
+import string
+from functools import lru_cache
+
+from mcp.types import PromptMessage, TextContent
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "prompts")
+RENDER_CACHE_SIZE = 256        # distinct argument sets kept per template
+
+
+class PromptTemplate:
+    """A prompt's text, compiled once: literal chunks + placeholder names.
+
+    Placeholders are plain `{name}` (write `{{` for a literal brace) and must
+    be declared arguments — checked here, at compile time, not on each get.
+    Renders are cached by their full argument set, so a large prompt fetched
+    again with the same arguments costs one dict lookup.
+    """
+
+    def __init__(self, name: str, text: str, arguments: list[dict]):
+        self.name = name
+        self.arguments = {arg["name"]: arg for arg in arguments}
+        self._parts = []               # (literal text, placeholder name or None)
+        for literal, field, spec, conversion in string.Formatter().parse(text):
+            if field is not None:
+                if spec or conversion:
+                    raise ValueError(f"Prompt {name}: only plain {{name}} placeholders are supported")
+                if field not in self.arguments:
+                    raise ValueError(f"Prompt {name}: placeholder {{{field}}} is not a declared argument")
+            self._parts.append((literal, field))
+        self._render = lru_cache(maxsize=RENDER_CACHE_SIZE)(self._render_uncached)
+
+    def render(self, args: dict) -> list[PromptMessage]:
+        unknown = args.keys() - self.arguments.keys()
+        if unknown:
+            raise ValueError(f"Unknown argument(s) for prompt {self.name}: {', '.join(sorted(unknown))}")
+        values = {}
+        for arg_name, arg in self.arguments.items():
+            if arg_name in args:
+                values[arg_name] = args[arg_name]
+            elif arg.get("required"):
+                raise ValueError(f"Missing required argument '{arg_name}' for prompt {self.name}")
+            else:
+                values[arg_name] = arg.get("default", "")
+        return self._render(tuple(sorted(values.items())))
+
+    def _render_uncached(self, key: tuple) -> list[PromptMessage]:
+        values = dict(key)
+        text = "".join(literal + (values[field] if field is not None else "")
+                       for literal, field in self._parts)
         return [
-            Prompt(name="math_expert", description="Act like a math professor"),
+            PromptMessage(
+                role="user",
+                content=TextContent(type="text", text=text)
+            )
         ]
 
-    @server.get_prompt()
-    async def handle_get_prompt(name: str, arguments: dict | None) -> GetPromptResult:
-        handler = PROMPT_MAP.get(name)
-        if not handler:
-            raise ValueError(f"Prompt not found: {name}")
-        
-        messages = await handler(arguments or {})
-        # You MUST wrap the list of messages in a GetPromptResult:
-        return GetPromptResult(messages=messages)
\ No newline at end of file
+
+def compile_prompt(spec: dict) -> PromptTemplate:
+    with open(os.path.join(TEMPLATE_DIR, spec["template"]), encoding="utf-8") as f:
+        return PromptTemplate(spec["name"], f.read().rstrip("\n"), spec.get("arguments", []))
@@ -0,0 +1,225 @@
+import importlib
+import os
+from typing import Any, Awaitable, Callable
+
+import anyio
+import jsonschema
+from mcp.types import Tool, TextContent
+
+ToolHandler = Callable[[dict], Awaitable[list[TextContent]]]
+Target = str | Callable            # a handler, or "package.module:function" to import on first use
+Validator = Callable[[Any, str], str | None]      # (value, path) -> error message or None
+
+# Limits for tools that don't set their own (@registry.tool(..., concurrency=, queue=, timeout=)).
+DEFAULT_CONCURRENCY = int(os.environ.get("MCP_TOOL_CONCURRENCY", "4"))   # calls running at once, per tool
+DEFAULT_QUEUE = int(os.environ.get("MCP_TOOL_QUEUE", "16"))              # calls allowed to wait for a slot
+DEFAULT_TIMEOUT = float(os.environ.get("MCP_TOOL_TIMEOUT", "30"))        # seconds, waiting included
+MAX_IN_FLIGHT = int(os.environ.get("MCP_MAX_IN_FLIGHT", "64"))           # all tools together
+
+# --- Schema compiler ---
+# Our tool schemas only use a small part of JSON Schema. For that part we build
+# plain closures once, at registration; checking arguments is then a few
+# isinstance() calls instead of a full jsonschema walk on every request.
+
+_TYPE_CHECKS = {
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "array": lambda v: isinstance(v, list),
+    "object": lambda v: isinstance(v, dict),
+    "null": lambda v: v is None,
+}
+# exact Python types json.loads produces for each JSON type (bool is not an integer here)
+_JSON_TYPES = {"integer": {int}, "number": {int, float}, "string": {str}, "boolean": {bool},
+               "array": {list}, "object": {dict}, "null": {type(None)}}
+_FAST_KEYWORDS = {"type", "properties", "required", "additionalProperties", "items",
+                  "minItems", "maxItems", "enum", "description", "title", "default"}
+
+
+def compile_validator(schema: dict) -> Validator:
+    """Build a validator for `schema`; falls back to jsonschema for anything unusual."""
+    if not schema.keys() <= _FAST_KEYWORDS or isinstance(schema.get("additionalProperties"), dict):
+        return _jsonschema_validator(schema)
+
+    checks = []
+    expected = schema.get("type")
+    if expected is not None:
+        types = expected if isinstance(expected, list) else [expected]
+        type_checks = [_TYPE_CHECKS[t] for t in types]
+        checks.append(lambda v, path: None if any(c(v) for c in type_checks)
+                      else f"{path or 'arguments'}: expected {' or '.join(types)}, got {type(v).__name__}")
+
+    if "enum" in schema:
+        allowed = schema["enum"]
+        checks.append(lambda v, path: None if any(v == a and type(v) is type(a) for a in allowed)
+                      else f"{path or 'arguments'}: must be one of {allowed}")
+
+    properties = {name: compile_validator(sub) for name, sub in schema.get("properties", {}).items()}
+    required = list(schema.get("required", []))
+    closed = schema.get("additionalProperties") is False
+    if properties or required or closed:
+        def check_object(v, path):
+            if not isinstance(v, dict):
+                return None
+            for name in required:
+                if name not in v:
+                    return f"{path or 'arguments'}: missing required property '{name}'"
+            for name, value in v.items():
+                validator = properties.get(name)
+                if validator is not None:
+                    error = validator(value, f"{path}.{name}" if path else name)
+                    if error:
+                        return error
+                elif closed:
+                    return f"{path or 'arguments'}: unexpected property '{name}'"
+            return None
+        checks.append(check_object)
+
+    if "items" in schema or "minItems" in schema or "maxItems" in schema:
+        items = schema.get("items")
+        # plain {"type": "..."} items (the common case for big arrays) skip the closure chain
+        item_type = items.get("type") if items and items.keys() == {"type"} else None
+        item_types = _JSON_TYPES.get(item_type) if isinstance(item_type, str) else None
+        item_validator = compile_validator(items) if items is not None else None
+        min_items, max_items = schema.get("minItems", 0), schema.get("maxItems")
+        def check_array(v, path):
+            if not isinstance(v, list):
+                return None
+            if len(v) < min_items or (max_items is not None and len(v) > max_items):
+                return f"{path or 'arguments'}: expected {min_items}..{max_items or ''} items, got {len(v)}"
+            if item_types is not None:
+                if set(map(type, v)) <= item_types:
+                    return None
+            elif item_validator is None:
+                return None
+            # only now build per-item paths, to name the first bad item
+            for i, value in enumerate(v):
+                error = item_validator(value, f"{path}[{i}]")
+                if error:
+                    return error
+            return None
+        checks.append(check_array)
+
+    def validate(v, path=""):
+        for check in checks:
+            error = check(v, path)
+            if error:
+                return error
+        return None
+    return validate
+
+
+def _jsonschema_validator(schema: dict) -> Validator:
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+    validator = cls(schema)          # schema checked and prepared once, reused per call
+
+    def validate(v, path=""):
+        error = jsonschema.exceptions.best_match(validator.iter_errors(v))
+        return f"{path or 'arguments'}: {error.message}" if error else None
+    return validate
+
+
+# --- Lazy loading ---
+
+_loaded: dict[str, Callable] = {}
+
+
+def load(target: Target) -> Callable:
+    """Resolve a "package.module:function" target, importing the module the first time."""
+    if callable(target):
+        return target
+    fn = _loaded.get(target)
+    if fn is None:
+        module, _, attr = target.partition(":")
+        fn = _loaded[target] = getattr(importlib.import_module(module), attr)
+    return fn
+
+
+# --- Admission control ---
+
+class Overloaded(RuntimeError):
+    pass
+
+
+class _Gate:
+    """Per-tool limits: `concurrency` calls run, up to `queue` more wait, the rest are turned away."""
+
+    def __init__(self, concurrency: int, queue: int, timeout: float):
+        self.semaphore = anyio.Semaphore(concurrency)
+        self.capacity = concurrency + queue
+        self.timeout = timeout
+        self.active = 0              # running + waiting; only touched on the event loop
+
+
+# --- Registry ---
+
+class ToolRegistry:
+    """Tools added from metadata (`add`) or declared with @registry.tool(...).
+
+    Everything that doesn't change between requests is built once here:
+    the `Tool` objects for tools/list and one compiled validator per schema.
+
+    Every call also goes through its tool's gate: a full gate (or too many
+    calls in flight overall) is refused at once instead of queueing without
+    bound, and each call has a deadline that covers waiting for a slot too.
+    """
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT):
+        self._handlers: dict[str, Target] = {}
+        self._validators: dict[str, Validator] = {}
+        self._gates: dict[str, _Gate] = {}
+        self._tools: list[Tool] = []
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+
+    def add(self, name: str, description: str, schema: dict | None, handler: Target, *,
+            concurrency: int | None = None, queue: int | None = None, timeout: float | None = None):
+        """Register a tool; a string `handler` isn't imported until the tool is first called."""
+        if name in self._handlers:
+            raise ValueError(f"Tool already registered: {name}")
+        schema = schema or {"type": "object", "properties": {}}
+        self._handlers[name] = handler
+        self._validators[name] = compile_validator(schema)
+        self._gates[name] = _Gate(concurrency or DEFAULT_CONCURRENCY,
+                                  DEFAULT_QUEUE if queue is None else queue,
+                                  timeout or DEFAULT_TIMEOUT)
+        self._tools.append(Tool(name=name, description=description, inputSchema=schema))
+
+    def tool(self, name: str, description: str, schema: dict | None = None, **limits):
+        def decorator(handler: ToolHandler) -> ToolHandler:
+            self.add(name, description, schema, handler, **limits)
+            return handler
+        return decorator
+
+    @property
+    def tools(self) -> list[Tool]:
+        return self._tools
+
+    async def dispatch(self, name: str, arguments: dict) -> list[TextContent]:
+        handler = self._handlers.get(name)
+        if not handler:
+            raise ValueError(f"Tool not found: {name}")
+        error = self._validators[name](arguments)
+        if error:
+            raise ValueError(f"Invalid arguments for {name}: {error}")
+
+        if isinstance(handler, str):
+            handler = self._handlers[name] = load(handler)
+
+        gate = self._gates[name]
+        if gate.active >= gate.capacity or self.in_flight >= self.max_in_flight:
+            raise Overloaded(f"Server busy: too many {name} calls in flight, try again later")
+        gate.active += 1
+        self.in_flight += 1
+        try:
+            # A client's notifications/cancelled cancels the SDK's scope around this
+            # call; that unwinds through here too, so the slot is always given back.
+            with anyio.move_on_after(gate.timeout):
+                async with gate.semaphore:
+                    return await handler(arguments)
+            raise TimeoutError(f"Tool {name} timed out after {gate.timeout:g}s")
+        finally:
+            gate.active -= 1
+            self.in_flight -= 1
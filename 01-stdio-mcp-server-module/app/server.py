@@ -1,7 +1,11 @@
 # server.py
 from mcp.server import Server
 from mcp.types import Tool
+
+from app.metrics import lifespan
+
 def create_server():
-    server =  Server(name="local-test-mcp-sever")
+    # lifespan starts the metrics sampler when the server starts running
+    server =  Server(name="local-test-mcp-sever", lifespan=lifespan)
 
     return server
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""Startup benchmark: how long a client waits before a fresh server is usable.
+
+Every client session spawns mcp_server.py as a new process, so this cost is
+paid per session. Measures, over N fresh spawns:
+  initialize  — spawn until the initialize response arrives
+  list_tools  — + first tools/list
+  first_call  — + first tools/call (includes lazily importing app/tools.py)
+
+    python bench_startup.py
+    python bench_startup.py -n 50
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+
+async def one_session(server_params: StdioServerParameters) -> dict:
+    start = time.perf_counter()
+    async with stdio_client(server_params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            initialized = time.perf_counter()
+            await session.list_tools()
+            listed = time.perf_counter()
+            await session.call_tool("add_numbers", {"a": 2, "b": 3})
+            called = time.perf_counter()
+    return {
+        "initialize": initialized - start,
+        "list_tools": listed - start,
+        "first_call": called - start,
+    }
+
+
+def report(samples: list[dict]):
+    print(f"{'stage':<12} {'min':>8} {'median':>8} {'p95':>8}   (ms, {len(samples)} spawns)")
+    for stage in samples[0]:
+        values = sorted(s[stage] * 1000 for s in samples)
+        p95 = values[min(len(values) - 1, round(0.95 * (len(values) - 1)))]
+        print(f"{stage:<12} {values[0]:>8.1f} {statistics.median(values):>8.1f} {p95:>8.1f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Measure spawn-to-initialize latency of mcp_server.py")
+    parser.add_argument("-n", type=int, default=20, help="number of fresh spawns")
+    parser.add_argument("--warmup", type=int, default=2, help="spawns to discard (fills the OS file cache)")
+    args = parser.parse_args()
+
+    server_params = StdioServerParameters(command=sys.executable, args=["mcp_server.py"], env=None)
+    for _ in range(args.warmup):
+        await one_session(server_params)
+    samples = [await one_session(server_params) for _ in range(args.n)]
+    report(samples)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,158 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+
+from mcp import StdioServerParameters
+from mcp.types import (InitializeResult, ListPromptsResult, ListResourcesResult,
+                       ListResourceTemplatesResult, ListToolsResult, PromptListChangedNotification,
+                       ResourceListChangedNotification, ServerNotification, ToolListChangedNotification)
+
+CACHE_DIR = os.environ.get("MCP_CAPABILITY_CACHE",
+                           os.path.join(os.path.expanduser("~"), ".cache", "mcp-capabilities"))
+MAX_AGE = float(os.environ.get("MCP_CAPABILITY_MAX_AGE", str(7 * 24 * 3600)))   # older = refetch first
+
+# kind -> (ClientSession method, result model)
+KINDS = {
+    "tools": ("list_tools", ListToolsResult),
+    "resources": ("list_resources", ListResourcesResult),
+    "resource_templates": ("list_resource_templates", ListResourceTemplatesResult),
+    "prompts": ("list_prompts", ListPromptsResult),
+}
+# notification -> kinds it makes stale
+_CHANGED = {
+    ToolListChangedNotification: ("tools",),
+    ResourceListChangedNotification: ("resources", "resource_templates"),
+    PromptListChangedNotification: ("prompts",),
+}
+
+
+class CapabilityCache:
+    """tools/resources/prompts lists saved on disk, one file per server + version.
+
+    - a saved list is returned at once, no round-trip; the first use of
+      each list in a session also refetches it in the background and saves
+      the answer for next time (stale-while-revalidate)
+    - a `list_changed` notification drops that list, so the next use
+      fetches it again (pass `on_message` as the session's message_handler)
+    - lists older than `max_age`, or not saved yet, are fetched before returning
+
+        caps = CapabilityCache(server_params)
+        async with StdioPool(server_params, message_handler=caps.on_message) as pool:
+            caps.connect(pool, pool.initialize_result)
+            tools = await caps.list_tools()
+        await caps.aclose()
+    """
+
+    def __init__(self, params: StdioServerParameters, cache_dir: str = CACHE_DIR, max_age: float = MAX_AGE):
+        self.params = params
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.path = None
+        self._client = None
+        self._saved: dict[str, dict] = {}        # kind -> {"fetched_at": ..., "result": json}
+        self._parsed: dict[str, object] = {}     # kind -> result model, parsed once
+        self._checked: set[str] = set()          # revalidated (or fetched) in this session
+        self._generation = dict.fromkeys(KINDS, 0)   # bumped by invalidate(): late answers are dropped
+        self._tasks: set[asyncio.Task] = set()
+
+    def connect(self, client, init: InitializeResult):
+        """Bind to an initialized client and load what was saved for this server/version."""
+        self._client = client
+        identity = {
+            "name": init.serverInfo.name,
+            "version": init.serverInfo.version,
+            "protocol": init.protocolVersion,
+            "command": [self.params.command, *self.params.args],
+            "cwd": os.path.abspath(self.params.cwd or os.getcwd()),
+        }
+        digest = hashlib.sha256(json.dumps(identity, sort_keys=True).encode()).hexdigest()[:16]
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", init.serverInfo.name)
+        self.path = os.path.join(self.cache_dir, f"{name}-{digest}.json")
+        try:
+            with open(self.path) as f:
+                self._saved = json.load(f)
+        except (OSError, ValueError):
+            self._saved = {}
+
+    async def aclose(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    # --- Lists (same names as ClientSession) ---
+
+    async def list_tools(self) -> ListToolsResult:
+        return await self._get("tools")
+
+    async def list_resources(self) -> ListResourcesResult:
+        return await self._get("resources")
+
+    async def list_resource_templates(self) -> ListResourceTemplatesResult:
+        return await self._get("resource_templates")
+
+    async def list_prompts(self) -> ListPromptsResult:
+        return await self._get("prompts")
+
+    async def _get(self, kind: str):
+        entry = self._saved.get(kind)
+        if entry is None or time.time() - entry["fetched_at"] > self.max_age:
+            return await self._fetch(kind)
+        if kind not in self._checked:
+            self._checked.add(kind)
+            task = asyncio.create_task(self._revalidate(kind))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if kind not in self._parsed:
+            self._parsed[kind] = KINDS[kind][1].model_validate(entry["result"])
+        return self._parsed[kind]
+
+    async def _fetch(self, kind: str):
+        method, _ = KINDS[kind]
+        generation = self._generation[kind]
+        result = await getattr(self._client, method)()
+        self._checked.add(kind)
+        if generation == self._generation[kind]:  # no list_changed while we were asking
+            self._parsed[kind] = result
+            self._saved[kind] = {"fetched_at": time.time(),
+                                 "result": result.model_dump(mode="json", by_alias=True, exclude_none=True)}
+            self._save()
+        return result
+
+    async def _revalidate(self, kind: str):
+        try:
+            await self._fetch(kind)
+        except Exception:
+            pass                                   # keep serving the saved list
+
+    # --- Invalidation ---
+
+    def invalidate(self, *kinds: str):
+        for kind in kinds or KINDS:
+            self._generation[kind] += 1
+            self._saved.pop(kind, None)
+            self._parsed.pop(kind, None)
+        if self.path:
+            self._save()
+
+    async def on_message(self, message):
+        """ClientSession message_handler: drop a list when the server says it changed."""
+        if isinstance(message, ServerNotification):
+            kinds = _CHANGED.get(type(message.root))
+            if kinds:
+                self.invalidate(*kinds)
+
+    def _save(self):
+        # write a temp file, then rename: a crash never leaves half a cache file
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._saved, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
@@ -1,6 +1,12 @@
 import asyncio
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+import json
+import os
+from mcp import StdioServerParameters
+
+from capability_cache import CapabilityCache
+from stdio_pool import StdioPool
+
+POOL_SIZE = int(os.environ.get("MCP_CLIENT_POOL", "2"))     # warm server processes
 
 async def run_test():
     server_params = StdioServerParameters(
@@ -9,88 +15,106 @@ async def run_test():
         env=None
     )
 
-    print("--- 🚀 Connecting to MCP Server ---")
+    print(f"--- 🚀 Starting {POOL_SIZE} MCP Server process(es) ---")
     
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
-            
-            # Fetch all capabilities once
-            tools_resp = await session.list_tools()
-            resources_resp = await session.list_resources()
-            prompts_resp = await session.list_prompts()
+    caps = CapabilityCache(server_params)
+    async with StdioPool(server_params, size=POOL_SIZE, message_handler=caps.on_message) as pool:
+        caps.connect(pool, pool.initialize_result)
+        # Capability lists come from the on-disk cache when we've seen this server
+        # before (refreshed in the background) - no discovery round-trips up front.
 
-            while True:
-                print("\n" + "="*30)
-                print("MAIN MENU:")
-                print("1. Call a Tool")
-                print("2. Read a Resource")
-                print("3. Get a Prompt")
-                print("4. Exit")
-                choice = input("Select an option (1-4): ")
+        while True:
+            print("\n" + "="*30)
+            print("MAIN MENU:")
+            print("1. Call a Tool")
+            print("2. Read a Resource")
+            print("3. Get a Prompt")
+            print("4. Exit")
+            choice = input("Select an option (1-4): ")
 
-                if choice == "1":
-                    # --- TOOL LOGIC ---
-                    print("\nAvailable Tools:")
-                    for t in tools_resp.tools:
-                        print(f" - {t.name}: {t.description}")
-                    
-                    target = input("\nEnter tool name: ")
-                    tool = next((t for t in tools_resp.tools if t.name == target), None)
+            if choice == "1":
+                tools_resp = await caps.list_tools()
+                # --- TOOL LOGIC ---
+                print("\nAvailable Tools:")
+                for t in tools_resp.tools:
+                    print(f" - {t.name}: {t.description}")
+                
+                target = input("\nEnter tool name: ")
+                tool = next((t for t in tools_resp.tools if t.name == target), None)
+                
+                if tool:
+                    args = {}
+                    properties = tool.inputSchema.get("properties", {})
+                    if properties:
+                        print(f"Tool requires: {list(properties.keys())}")
+                        for key in properties:
+                            val = input(f"  Enter value for '{key}': ")
+                            # Simple type conversion
+                            if properties[key].get("type") == "integer":
+                                args[key] = int(val)
+                            elif properties[key].get("type") == "array":
+                                args[key] = json.loads(val)     # e.g. [1, 2, 3]
+                            else:
+                                args[key] = val
                     
-                    if tool:
-                        args = {}
-                        properties = tool.inputSchema.get("properties", {})
-                        if properties:
-                            print(f"Tool requires: {list(properties.keys())}")
-                            for key in properties:
-                                val = input(f"  Enter value for '{key}': ")
-                                # Simple type conversion
-                                if properties[key].get("type") == "integer":
-                                    args[key] = int(val)
-                                else:
-                                    args[key] = val
-                        
-                        print(f"Calling {target}...")
-                        result = await session.call_tool(target, arguments=args)
+                    times = int(input("  Run how many times in parallel? (blank = 1): ") or 1)
+                    print(f"Calling {target}...")
+                    results = await pool.call_many([(target, args)] * times)
+                    for result in results:
+                        if isinstance(result, Exception):
+                            print(f"Error: {result}")
+                            continue
                         for content in result.content:
                             print(f"Output: {content.text}")
-                    else:
-                        print("Invalid tool name.")
+                else:
+                    print("Invalid tool name.")
 
-                elif choice == "2":
-                    # --- RESOURCE LOGIC ---
-                    print("\nAvailable Resources:")
-                    for r in resources_resp.resources:
-                        print(f" - {r.uri} ({r.name})")
-                    
-                    uri = input("\nEnter resource URI: ")
-                    print(f"Reading {uri}...")
-                    try:
-                        # Note: session.read_resource returns a ReadResourceResult
-                        result = await session.read_resource(uri)
-                        for content in result.contents:
-                            print(f"Content:\n{content.text}")
-                    except Exception as e:
-                        print(f"Error: {e}")
+            elif choice == "2":
+                resources_resp = await caps.list_resources()
+                templates_resp = await caps.list_resource_templates()
+                # --- RESOURCE LOGIC ---
+                print("\nAvailable Resources:")
+                for r in resources_resp.resources:
+                    print(f" - {r.uri} ({r.name})")
+                for t in templates_resp.resourceTemplates:
+                    print(f" - {t.uriTemplate} ({t.name}) — fill in the {{...}} part")
+                
+                uri = input("\nEnter resource URI: ")
+                print(f"Reading {uri}...")
+                try:
+                    # Note: session.read_resource returns a ReadResourceResult
+                    result = await pool.read_resource(uri)
+                    for content in result.contents:
+                        print(f"Content:\n{content.text}")
+                except Exception as e:
+                    print(f"Error: {e}")
 
-                elif choice == "3":
-                    # --- PROMPT LOGIC ---
-                    print("\nAvailable Prompts:")
-                    for p in prompts_resp.prompts:
-                        print(f" - {p.name}: {p.description}")
-                    
-                    p_name = input("\nEnter prompt name: ")
-                    print(f"Fetching prompt {p_name}...")
-                    try:
-                        result = await session.get_prompt(p_name, arguments={})
-                        for msg in result.messages:
-                            print(f"[{msg.role.upper()}]: {msg.content.text}")
-                    except Exception as e:
-                        print(f"Error: {e}")
+            elif choice == "3":
+                prompts_resp = await caps.list_prompts()
+                # --- PROMPT LOGIC ---
+                print("\nAvailable Prompts:")
+                for p in prompts_resp.prompts:
+                    print(f" - {p.name}: {p.description}")
+                
+                p_name = input("\nEnter prompt name: ")
+                prompt = next((p for p in prompts_resp.prompts if p.name == p_name), None)
+                p_args = {}
+                for arg in (prompt.arguments or []) if prompt else []:
+                    val = input(f"  Enter value for '{arg.name}' (blank = default): ")
+                    if val:
+                        p_args[arg.name] = val
+                print(f"Fetching prompt {p_name}...")
+                try:
+                    result = await pool.get_prompt(p_name, arguments=p_args)
+                    for msg in result.messages:
+                        print(f"[{msg.role.upper()}]: {msg.content.text}")
+                except Exception as e:
+                    print(f"Error: {e}")
+
+            elif choice == "4" or not choice:
+                break
 
-                elif choice == "4" or not choice:
-                    break
+        await caps.aclose()
 
 if __name__ == "__main__":
     try:
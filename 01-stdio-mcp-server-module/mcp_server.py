@@ -1,16 +1,14 @@
 import asyncio
 import sys
 import traceback
-from mcp.server import Server
 from mcp.server.stdio import stdio_server
-from mcp.types import Tool, TextContent
 
 # Encapsulate app creation
 def create_app():
     from app.server import create_server
-    from app.prompt import register_prompts
-    from app.resource  import register_resources
-    from app.tools import register_tools
+    # Registers from app/manifest.py; tools.py / resource.py are only imported
+    # when one of their functions is first used. Prompt templates are compiled here.
+    from app.loader import register_tools, register_prompts, register_resources
     
     app = create_server()
     register_tools(app)
@@ -0,0 +1,207 @@
+import asyncio
+import sys
+import time
+from datetime import timedelta
+
+import anyio
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED, ErrorData
+
+# The process is gone and the request never left this side: safe to send it to another worker.
+_NOT_SENT = (anyio.ClosedResourceError, anyio.BrokenResourceError)
+
+
+class _Worker:
+    def __init__(self, index: int):
+        self.index = index
+        self.session: ClientSession | None = None     # set only while initialized and healthy
+        self.broken = asyncio.Event()
+        self.in_flight = 0
+        self.calls = 0
+        self.restarts = 0
+        self.last_error = None
+
+
+class StdioPool:
+    """N warm stdio server processes behind one client.
+
+    - every worker is spawned and `initialize`d up front, so the first call
+      doesn't pay for a process start + handshake
+    - each call goes to the ready worker with the fewest calls in flight, so
+      concurrent calls really run in parallel (one process each)
+    - a worker whose process dies (noticed on a failed call or a periodic
+      ping) is restarted in the background, with backoff; calls that never
+      reached a dead worker are re-sent to another one, calls that were
+      already running on it fail (they may have had side effects)
+
+        async with StdioPool(StdioServerParameters(command="python", args=["mcp_server.py"]), size=4) as pool:
+            results = await pool.call_many([("add_numbers", {"a": i, "b": 1}) for i in range(100)])
+    """
+
+    def __init__(self, params: StdioServerParameters, size: int = 4, timeout: float = 30.0,
+                 start_timeout: float = 30.0, health_interval: float = 5.0,
+                 restart_delay: float = 0.5, errlog=sys.stderr, message_handler=None):
+        self.params = params
+        self.timeout = timeout                    # per call
+        self.start_timeout = start_timeout        # spawn + initialize, and waiting for any ready worker
+        self.health_interval = health_interval    # seconds between pings of an idle worker
+        self.restart_delay = restart_delay        # first backoff; doubles up to 10s while starts keep failing
+        self.errlog = errlog
+        self.message_handler = message_handler    # gets every worker's notifications (e.g. list_changed)
+        self.initialize_result = None             # server name/version/capabilities, once a worker is up
+        self._workers = [_Worker(i) for i in range(size)]
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()            # set whenever a worker becomes ready
+
+    async def __aenter__(self):
+        self._tasks = [asyncio.create_task(self._run(w)) for w in self._workers]
+        deadline = time.monotonic() + self.start_timeout
+        while not all(w.session for w in self._workers) and time.monotonic() < deadline:
+            self._wakeup.clear()
+            with anyio.move_on_after(deadline - time.monotonic()):
+                await self._wakeup.wait()
+        if not any(w.session for w in self._workers):
+            await self.__aexit__(None, None, None)
+            errors = {w.last_error for w in self._workers if w.last_error}
+            raise RuntimeError(f"No server process started within {self.start_timeout:g}s: {errors or 'timed out'}")
+        return self
+
+    async def __aexit__(self, *exc):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # --- Workers ---
+
+    async def _run(self, worker: _Worker):
+        """Keep one server process alive: start it, watch it, restart it when it dies."""
+        delay = self.restart_delay
+        while True:
+            try:
+                async with stdio_client(self.params, errlog=self.errlog) as (read, write):
+                    async with ClientSession(read, write, message_handler=self.message_handler) as session:
+                        with anyio.fail_after(self.start_timeout):
+                            self.initialize_result = await session.initialize()
+                        worker.broken = asyncio.Event()
+                        worker.session = session
+                        self._wakeup.set()
+                        delay = self.restart_delay
+                        await self._watch(worker, session)
+            except Exception as e:
+                worker.last_error = f"{type(e).__name__}: {e}"
+            finally:
+                worker.session = None
+                worker.broken.set()                # fail calls still waiting on this process
+            worker.restarts += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 10.0)
+
+    async def _watch(self, worker: _Worker, session: ClientSession):
+        """Return once the worker is known to be dead: a call saw it, or a ping failed."""
+        while True:
+            with anyio.move_on_after(self.health_interval):
+                await worker.broken.wait()
+                return
+            if worker.in_flight:
+                continue                           # busy workers are proven alive by their calls
+            try:
+                with anyio.fail_after(self.health_interval):
+                    await session.send_ping()
+            except Exception as e:
+                worker.last_error = f"ping failed: {type(e).__name__}: {e}"
+                return
+
+    def _mark_broken(self, worker: _Worker, broken: asyncio.Event, error: BaseException):
+        if worker.broken is broken:                # not already replaced by a restarted process
+            worker.session = None
+            worker.last_error = f"{type(error).__name__}: {error}"
+        broken.set()
+
+    async def _pick(self) -> _Worker:
+        deadline = time.monotonic() + self.start_timeout
+        while True:
+            ready = [w for w in self._workers if w.session]
+            if ready:
+                return min(ready, key=lambda w: w.in_flight)
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"No server process ready after {self.start_timeout:g}s")
+            self._wakeup.clear()
+            with anyio.move_on_after(deadline - time.monotonic()):
+                await self._wakeup.wait()
+
+    @staticmethod
+    async def _until_broken(broken: asyncio.Event, request):
+        """Await `request`, but fail at once if its worker dies meanwhile.
+
+        A session torn down by a crash doesn't always answer the requests it
+        still had pending; without this they would sit out the full timeout.
+        """
+        call = asyncio.ensure_future(request)
+        died = asyncio.ensure_future(broken.wait())
+        try:
+            await asyncio.wait((call, died), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            died.cancel()
+            if not call.done():
+                call.cancel()
+        if not call.done():
+            raise McpError(ErrorData(code=CONNECTION_CLOSED, message="Server process died during the request"))
+        return call.result()
+
+    async def _request(self, method: str, *args, **kwargs):
+        """Run `ClientSession.<method>(*args)` on the least busy worker."""
+        for attempt in range(len(self._workers) + 1):
+            worker = await self._pick()
+            session, broken = worker.session, worker.broken
+            worker.in_flight += 1
+            try:
+                result = await self._until_broken(broken, getattr(session, method)(*args, **kwargs))
+                worker.calls += 1
+                return result
+            except _NOT_SENT as e:
+                self._mark_broken(worker, broken, e)
+                if attempt == len(self._workers):
+                    raise
+            except McpError as e:
+                if e.error.code == CONNECTION_CLOSED:      # died while running this call
+                    self._mark_broken(worker, broken, e)
+                raise
+            finally:
+                worker.in_flight -= 1
+
+    # --- Client API (same names as ClientSession) ---
+
+    async def call_tool(self, name: str, arguments: dict | None = None):
+        return await self._request("call_tool", name, arguments or {},
+                                   read_timeout_seconds=timedelta(seconds=self.timeout))
+
+    async def call_many(self, calls: list[tuple[str, dict]]) -> list:
+        """Run all calls concurrently; results in input order, exceptions returned in place."""
+        return await asyncio.gather(*(self.call_tool(name, args) for name, args in calls),
+                                    return_exceptions=True)
+
+    async def list_tools(self):
+        return await self._request("list_tools")
+
+    async def list_resources(self):
+        return await self._request("list_resources")
+
+    async def list_resource_templates(self):
+        return await self._request("list_resource_templates")
+
+    async def list_prompts(self):
+        return await self._request("list_prompts")
+
+    async def read_resource(self, uri: str):
+        return await self._request("read_resource", uri)
+
+    async def get_prompt(self, name: str, arguments: dict | None = None):
+        return await self._request("get_prompt", name, arguments)
+
+    def status(self) -> list[dict]:
+        return [{"worker": w.index, "ready": w.session is not None, "in_flight": w.in_flight,
+                 "calls": w.calls, "restarts": w.restarts, "last_error": w.last_error}
+                for w in self._workers]
@@ -1,12 +1,18 @@
 import asyncio
+import json
 import sys
 import os
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+from mcp import StdioServerParameters
+
+# StdioPool and CapabilityCache live in the 01 low-level module — one copy, shared by both clients
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "01-stdio-mcp-server-module"))
+from capability_cache import CapabilityCache
+from stdio_pool import StdioPool
 
 # ── Config ────────────────────────────────────────────────────────────────────
 DEMO_DIR = os.path.dirname(os.path.abspath(__file__))
 DEMO_FILE = os.path.join(DEMO_DIR, "demo_output.txt")
+POOL_SIZE = int(os.environ.get("MCP_CLIENT_POOL", "2"))     # warm server processes
 
 # ── Client ────────────────────────────────────────────────────────────────────
 
@@ -19,76 +25,91 @@ async def main():
 
     print("🔌 Connecting to FileSystemAssistant MCP server...\n")
 
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
-            print("✅ Connected!\n")
+    caps = CapabilityCache(server_params)
+    async with StdioPool(server_params, size=POOL_SIZE, message_handler=caps.on_message) as pool:
+        caps.connect(pool, pool.initialize_result)
+        print(f"✅ Connected! ({POOL_SIZE} server processes)\n")
+
+        # ── 1. List available tools (from the on-disk cache after the first run) ──
+        tools = await caps.list_tools()
+        print("📋 Available Tools:")
+        for t in tools.tools:
+            print(f"   - {t.name}: {t.description}")
+        print()
+
+
+
 
-            # ── 1. List available tools ────────────────────────────────────
-            tools = await session.list_tools()
-            print("📋 Available Tools:")
-            for t in tools.tools:
-                print(f"   - {t.name}: {t.description}")
-            print()
+        # ── 2. Write a file ───────────────────────────────────────────
+        print(f"✍️  Writing to: {DEMO_FILE}")
+        result = await pool.call_tool("write_file", arguments={
+            "path": DEMO_FILE,
+            "content": "Hello from MCP!\nLine 2: File access is working.\nLine 3: Done."
+        })
+        print(f"   Result: {result.content[0].text}\n")
 
 
 
 
-            # ── 2. Write a file ───────────────────────────────────────────
-            print(f"✍️  Writing to: {DEMO_FILE}")
-            result = await session.call_tool("write_file", arguments={
-                "path": DEMO_FILE,
-                "content": "Hello from MCP!\nLine 2: File access is working.\nLine 3: Done."
-            })
-            print(f"   Result: {result.content[0].text}\n")
+        # ── 3. List files in the directory ────────────────────────────
+        print(f"📁 Listing files in: {DEMO_DIR}")
+        result = await pool.call_tool("list_files", arguments={
+            "directory": DEMO_DIR
+        })
+        listing = json.loads(result.content[0].text)
+        print(f"   Files: ")
+        for entry in listing.get("entries", []):
+            print(f"   - {entry['name']} ({entry['type']}, {entry['size']} bytes)")
 
 
 
 
-            # ── 3. List files in the directory ────────────────────────────
-            print(f"📁 Listing files in: {DEMO_DIR}")
-            result = await session.call_tool("list_files", arguments={
-                "directory": DEMO_DIR
-            })
-            files = result.content[0].text
-            print(f"   Files: ")
-            for i in result.content:
-                print("   -",i.text)
 
+        # ── 4. Read the file we just wrote ────────────────────────────
+        print(f"📖 Reading back: {DEMO_FILE}")
+        result = await pool.call_tool("read_file", arguments={
+            "path": DEMO_FILE
+        })
+        print(f"   Content:\n{result.content[0].text}\n")
 
 
 
 
-            # ── 4. Read the file we just wrote ────────────────────────────
-            print(f"📖 Reading back: {DEMO_FILE}")
-            result = await session.call_tool("read_file", arguments={
-                "path": DEMO_FILE
-            })
-            print(f"   Content:\n{result.content[0].text}\n")
+        # ── 5. Edit (overwrite) the file ──────────────────────────────
+        print(f"✏️  Editing file (overwrite)...")
+        result = await pool.call_tool("write_file", arguments={
+            "path": DEMO_FILE,
+            "content": "Updated content!\nEdit made via MCP write_file tool."
+        })
+        print(f"   Result: {result.content[0].text}\n")
 
 
 
 
-            # ── 5. Edit (overwrite) the file ──────────────────────────────
-            print(f"✏️  Editing file (overwrite)...")
-            result = await session.call_tool("write_file", arguments={
-                "path": DEMO_FILE,
-                "content": "Updated content!\nEdit made via MCP write_file tool."
-            })
-            print(f"   Result: {result.content[0].text}\n")
 
+        # ── 6. Read it again to confirm edit ─────────────────────────
+        print(f"📖 Reading after edit:")
+        result = await pool.call_tool("read_file", arguments={
+            "path": DEMO_FILE
+        })
+        print(f"   Content:\n{result.content[0].text}\n")
 
 
 
 
-            # ── 6. Read it again to confirm edit ─────────────────────────
-            print(f"📖 Reading after edit:")
-            result = await session.call_tool("read_file", arguments={
-                "path": DEMO_FILE
-            })
-            print(f"   Content:\n{result.content[0].text}\n")
+        # ── 7. Read it from every process at once ────────────────────
+        print(f"⚡ Reading {POOL_SIZE} times in parallel:")
+        results = await pool.call_many([("read_file", {"path": DEMO_FILE})] * POOL_SIZE)
+        texts = set()
+        for result in results:
+            if isinstance(result, Exception):       # e.g. a worker crashed mid-call
+                print(f"   Error: {result}")
+            else:
+                texts.add(result.content[0].text)
+        print(f"   Same content each time: {len(texts) == 1}\n")
 
-            print("✅ Demo complete!")
+        print("✅ Demo complete!")
+        await caps.aclose()
 
 
 if __name__ == "__main__":
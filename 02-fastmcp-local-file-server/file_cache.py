@@ -0,0 +1,77 @@
+import collections
+import os
+import threading
+import time
+
+
+class FileCache:
+    """In-process LRU cache for file contents and directory listings.
+
+    Entries are evicted least-recently-used first once their combined
+    (approximate) size goes over `max_bytes`. Every entry carries a
+    validator, usually mtime/size taken from `os.stat`. A lookup passes a
+    check function that compares the stored validator with the disk, so a
+    stale entry is dropped instead of being served.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()  # key -> (validator, value, cost, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key, is_valid):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            validator, value, cost, expires_at = item
+            if (expires_at is not None and time.monotonic() > expires_at) or not is_valid(validator):
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, validator, cost: int, ttl: float | None = None):
+        if cost > self.max_bytes:
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (validator, value, cost, expires_at)
+            self.used_bytes += cost
+            while self.used_bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, path: str):
+        """Forget a file and every cached listing of a directory above it."""
+        path = os.path.abspath(path)
+        with self._lock:
+            for key in list(self._entries):
+                kind, target = key[0], key[1]
+                if target == path or (kind == "list" and _is_under(path, target)):
+                    self._drop(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "used_bytes": self.used_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _drop(self, key):
+        _, _, cost, _ = self._entries.pop(key)
+        self.used_bytes -= cost
+
+
+def _is_under(path: str, directory: str) -> bool:
+    return path == directory or path.startswith(directory.rstrip(os.sep) + os.sep)
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import mmap
+import multiprocessing
+import os
+import sqlite3
+import stat
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from search_index import SKIP_DIRS
+
+HASH_PARALLEL_MIN_FILES = 32     # below this, hashing in-thread beats process start-up + IPC
+DIGEST_SIZE = 16
+KEEP_ROOTS = 32                  # most recently used roots kept diffable; older tree nodes are deleted
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def hash_file(path: str) -> str:
+    """blake2b of a file's bytes, read through mmap so nothing is copied into Python."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.blake2b(b"", digest_size=DIGEST_SIZE).hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hashlib.blake2b(mm, digest_size=DIGEST_SIZE).hexdigest()
+
+
+def _hash_or_none(path: str) -> str | None:
+    try:
+        return hash_file(path)
+    except OSError:
+        return None     # vanished or unreadable since the walk
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    # "spawn" so workers never inherit the server's threads and locks mid-flight
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 2,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+class MerkleStore:
+    """Persisted Merkle tree of one directory.
+
+    Each file's hash is cached with the mtime/size it was computed at, so a
+    snapshot only re-hashes files that changed. Directory nodes are stored
+    by their own hash (like git tree objects), which keeps every earlier
+    root available to diff against. Diffing two roots skips any subtree
+    whose hash matches, so it costs O(changes), not O(files).
+
+    Only the `KEEP_ROOTS` most recently taken or diffed roots are kept: when
+    a snapshot produces a new root, nodes no kept root reaches are deleted.
+    """
+
+    def __init__(self, root: str, db_path: str):
+        self.root = os.path.abspath(root)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                hash TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS nodes (
+                hash TEXT PRIMARY KEY,
+                children TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS roots (
+                hash TEXT PRIMARY KEY,
+                used_ns INTEGER NOT NULL
+            );
+        ''')
+
+    def snapshot(self, pin: str | None = None) -> dict:
+        """Bring the tree up to date with the disk and return its root hash.
+
+        `pin` is an older root about to be diffed against; it counts as just
+        used, so pruning after this snapshot keeps it.
+        """
+        with self._lock:
+            known = {path: (mtime_ns, size, digest) for path, mtime_ns, size, digest
+                     in self._conn.execute("SELECT path, mtime_ns, size, hash FROM files")}
+            dirs, files, stale = self._walk(known)
+
+            hashed = self._hash_many([os.path.join(self.root, rel) for rel, _ in stale])
+            for (rel, st), digest in zip(stale, hashed):
+                if digest is None:
+                    files.pop(rel, None)
+                    dirs[os.path.dirname(rel)].pop(os.path.basename(rel), None)
+                    continue
+                files[rel] = digest
+                dirs[os.path.dirname(rel)][os.path.basename(rel)] = ["f", digest]
+                self._conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                                   (rel, st.st_mtime_ns, st.st_size, digest))
+            for rel in known.keys() - files.keys():
+                self._conn.execute("DELETE FROM files WHERE path = ?", (rel,))
+
+            # deepest directories first, so every child hash exists before its parent's
+            root_hash = None
+            for rel in sorted(dirs, key=lambda d: d.count(os.sep) + (d != ""), reverse=True):
+                children = dirs[rel]
+                body = json.dumps(children, sort_keys=True, separators=(",", ":"))
+                node_hash = hashlib.blake2b(body.encode(), digest_size=DIGEST_SIZE).hexdigest()
+                self._conn.execute("INSERT OR IGNORE INTO nodes VALUES (?, ?)", (node_hash, body))
+                if rel == "":
+                    root_hash = node_hash
+                else:
+                    dirs[os.path.dirname(rel)][os.path.basename(rel)] = ["d", node_hash]
+
+            now = time.time_ns()
+            if pin is not None:
+                self._conn.execute("UPDATE roots SET used_ns = ? WHERE hash = ?", (now, pin))
+            is_new = self._conn.execute("SELECT 1 FROM roots WHERE hash = ?", (root_hash,)).fetchone() is None
+            self._conn.execute("INSERT OR REPLACE INTO roots VALUES (?, ?)", (root_hash, now))
+            if is_new:
+                self._prune()
+            self._conn.commit()
+            return {"root": root_hash, "files": len(files), "rehashed": len(stale)}
+
+    def _prune(self):
+        """Drop all but the KEEP_ROOTS most recent roots and every node only they reached."""
+        self._conn.execute("DELETE FROM roots WHERE hash NOT IN "
+                           "(SELECT hash FROM roots ORDER BY used_ns DESC LIMIT ?)", (KEEP_ROOTS,))
+        live = set()
+        todo = [h for (h,) in self._conn.execute("SELECT hash FROM roots")]
+        while todo:
+            node_hash = todo.pop()
+            if node_hash in live:
+                continue          # shared subtree, already walked
+            live.add(node_hash)
+            row = self._conn.execute("SELECT children FROM nodes WHERE hash = ?", (node_hash,)).fetchone()
+            if row:
+                todo.extend(child[1] for child in json.loads(row[0]).values() if child[0] == "d")
+        dead = [h for (h,) in self._conn.execute("SELECT hash FROM nodes") if h not in live]
+        self._conn.executemany("DELETE FROM nodes WHERE hash = ?", ((h,) for h in dead))
+
+    def has_root(self, node_hash: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM roots WHERE hash = ?",
+                                      (node_hash,)).fetchone() is not None
+
+    def diff(self, old_root: str, new_root: str, limit: int) -> tuple[list[dict], bool]:
+        """Changes from old_root to new_root; True as second value if cut at `limit`."""
+        changes = []
+        with self._lock:
+            truncated = self._diff(old_root, new_root, "", changes, limit)
+        return changes, truncated
+
+    def _diff(self, old: str, new: str, prefix: str, out: list, limit: int) -> bool:
+        if old == new:
+            return False
+        old_children, new_children = self._children(old), self._children(new)
+        for name in sorted(old_children.keys() | new_children.keys()):
+            before, after = old_children.get(name), new_children.get(name)
+            if before == after:
+                continue
+            if len(out) >= limit:
+                return True
+            path = os.path.join(prefix, name)
+            if before is None:
+                out.append({"path": path, "change": "added", "type": _kind(after)})
+            elif after is None:
+                out.append({"path": path, "change": "removed", "type": _kind(before)})
+            elif before[0] == after[0] == "d":
+                if self._diff(before[1], after[1], path, out, limit):
+                    return True
+            else:
+                out.append({"path": path, "change": "modified", "type": _kind(after)})
+        return False
+
+    def _children(self, node_hash: str) -> dict:
+        row = self._conn.execute("SELECT children FROM nodes WHERE hash = ?", (node_hash,)).fetchone()
+        if row is None:
+            raise KeyError(f"unknown tree hash {node_hash}")
+        return json.loads(row[0])
+
+    def _walk(self, known: dict):
+        """One stat per file; returns dir listings, cached hashes and files to re-hash."""
+        dirs = {}        # rel dir -> {name: [kind, hash]}
+        files = {}       # rel file -> hash (only the unchanged ones so far)
+        stale = []       # (rel file, stat) that need hashing
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".") and d not in SKIP_DIRS]
+            rel_dir = os.path.relpath(dirpath, self.root)
+            rel_dir = "" if rel_dir == "." else rel_dir
+            children = dirs.setdefault(rel_dir, {})
+            for name in filenames:
+                rel = os.path.join(rel_dir, name)
+                try:
+                    st = os.stat(os.path.join(dirpath, name), follow_symlinks=False)
+                except OSError:
+                    continue
+                if not stat.S_ISREG(st.st_mode):
+                    continue
+                cached = known.get(rel)
+                if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+                    files[rel] = cached[2]
+                    children[name] = ["f", cached[2]]
+                else:
+                    stale.append((rel, st))
+        return dirs, files, stale
+
+    def _hash_many(self, paths: list[str]) -> list[str | None]:
+        if len(paths) < HASH_PARALLEL_MIN_FILES:
+            return [_hash_or_none(p) for p in paths]
+        chunksize = max(1, len(paths) // ((os.cpu_count() or 2) * 4))
+        try:
+            return list(_process_pool().map(_hash_or_none, paths, chunksize=chunksize))
+        except BrokenProcessPool:
+            _reset_pool()
+            return [_hash_or_none(p) for p in paths]
+
+
+def _kind(child: list) -> str:
+    return "dir" if child[0] == "d" else "file"
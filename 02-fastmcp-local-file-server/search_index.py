@@ -0,0 +1,187 @@
+import os
+import sqlite3
+import threading
+import time
+
+INDEX_MAX_FILE_BYTES = 1024 * 1024     # bigger files are not indexed
+MAX_HITS_PER_FILE = 20
+REFRESH_BATCH_BYTES = 4 * 1024 * 1024  # file text read per locked write during a sweep
+SKIP_DIRS = {"node_modules", "__pycache__", "venv", ".venv"}
+
+
+def _skip_dir(name: str) -> bool:
+    return name.startswith(".") or name in SKIP_DIRS
+
+
+class SearchIndex:
+    """Persistent trigram index over the text files under one directory.
+
+    Backed by an SQLite FTS5 table with the `trigram` tokenizer, so any
+    substring of 3+ characters is answered from the index. The `files` table
+    remembers the mtime/size each file was indexed at; `refresh()` re-reads
+    only files whose mtime/size changed and drops files that disappeared.
+    """
+
+    def __init__(self, root: str, db_path: str, refresh_interval: float):
+        self.root = os.path.abspath(root)
+        self.db_path = db_path
+        self.refresh_interval = refresh_interval
+        self.last_refresh = 0.0
+        self._lock = threading.Lock()            # the SQLite connection; held only for short writes/reads
+        self._refresh_lock = threading.Lock()    # one sweep at a time
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS content
+                USING fts5(path UNINDEXED, body, tokenize = 'trigram');
+        ''')
+
+    # ── keeping the index up to date ─────────────────────────────────────
+
+    def refresh(self, force: bool = False) -> dict:
+        """Re-index files whose mtime/size changed since the last refresh.
+
+        Costs one stat per file; file contents are only read when they changed.
+        Skipped if the last refresh is younger than `refresh_interval`.
+        Files are stat'ed and read without holding the connection lock, which
+        is only taken for each batch of writes, so a long sweep doesn't block
+        `update_file` (and with it write_file) or searches.
+        """
+        with self._refresh_lock:
+            if not force and time.monotonic() - self.last_refresh < self.refresh_interval:
+                return {"updated": 0, "removed": 0, "skipped": True}
+            with self._lock:
+                known = {path: (mtime_ns, size) for path, mtime_ns, size
+                         in self._conn.execute("SELECT path, mtime_ns, size FROM files")}
+            seen = set()
+            updated = 0
+            batch, batch_bytes = [], 0
+            for rel, st in self._walk():
+                seen.add(rel)
+                if known.get(rel) != (st.st_mtime_ns, st.st_size):
+                    body = self._read_body(rel)
+                    batch.append((rel, st, body))
+                    batch_bytes += len(body or "")
+                    updated += 1
+                    if batch_bytes >= REFRESH_BATCH_BYTES:
+                        self._store_batch(batch)
+                        batch, batch_bytes = [], 0
+            self._store_batch(batch)
+            removed = known.keys() - seen
+            with self._lock:
+                for rel in removed:
+                    self._remove(rel)
+                self._conn.commit()
+            self.last_refresh = time.monotonic()
+            return {"updated": updated, "removed": len(removed), "skipped": False}
+
+    def update_file(self, path: str):
+        """Re-index a single file right after it was written through the server."""
+        path = os.path.abspath(path)
+        if not path.startswith(self.root + os.sep):
+            return
+        rel = os.path.relpath(path, self.root)
+        # same rules as the sweep (_walk), so results don't depend on which ran last
+        if any(_skip_dir(d) for d in os.path.dirname(rel).split(os.sep) if d):
+            return
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            st = None
+        if st is not None and st.st_size <= INDEX_MAX_FILE_BYTES:
+            self._store_batch([(rel, st, self._read_body(rel))])      # read outside the lock
+        else:
+            with self._lock:
+                self._remove(rel)
+                self._conn.commit()
+
+    def _walk(self):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not _skip_dir(d)]
+            for name in filenames:
+                full = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(full)
+                except OSError:
+                    continue
+                if st.st_size <= INDEX_MAX_FILE_BYTES:
+                    yield os.path.relpath(full, self.root), st
+
+    def _read_body(self, rel: str) -> str | None:
+        """The text to index for one file ("" for binary), None if it can't be read."""
+        try:
+            with open(os.path.join(self.root, rel), "rb") as f:
+                data = f.read(INDEX_MAX_FILE_BYTES + 1)
+        except OSError:
+            return None
+        return "" if b"\0" in data[:8192] else data.decode("utf-8", errors="replace")   # binary → empty
+
+    def _store_batch(self, batch: list):
+        """Write already-read files into the index in one short locked transaction."""
+        if not batch:
+            return
+        with self._lock:
+            for rel, st, body in batch:
+                row = self._conn.execute("SELECT mtime_ns FROM files WHERE path = ?", (rel,)).fetchone()
+                if row and row[0] > st.st_mtime_ns:
+                    continue          # a newer version was indexed while we were reading this one
+                if body is None:
+                    self._remove(rel)
+                    continue
+                self._conn.execute("DELETE FROM content WHERE path = ?", (rel,))
+                if body:
+                    self._conn.execute("INSERT INTO content (path, body) VALUES (?, ?)", (rel, body))
+                self._conn.execute("INSERT OR REPLACE INTO files (path, mtime_ns, size) VALUES (?, ?, ?)",
+                                   (rel, st.st_mtime_ns, st.st_size))
+            self._conn.commit()
+
+    def _remove(self, rel: str):
+        self._conn.execute("DELETE FROM content WHERE path = ?", (rel,))
+        self._conn.execute("DELETE FROM files WHERE path = ?", (rel,))
+
+    # ── querying ─────────────────────────────────────────────────────────
+
+    def search(self, query: str, limit: int, case_sensitive: bool = False) -> list[dict]:
+        """Files containing `query`, best bm25 rank first, with line/column hits."""
+        if len(query) >= 3:
+            sql = ("SELECT path, body, bm25(content) FROM content WHERE content MATCH ? "
+                   "ORDER BY bm25(content) LIMIT ?")
+            params = ('"' + query.replace('"', '""') + '"', limit * 4 if case_sensitive else limit)
+        else:
+            # too short for a trigram: fall back to a scan of the indexed text (still no disk I/O)
+            escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            sql = "SELECT path, body, 0.0 FROM content WHERE body LIKE ? ESCAPE '\\' LIMIT ?"
+            params = (f"%{escaped}%", limit * 4 if case_sensitive else limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        results = []
+        for path, body, rank in rows:
+            hits = _find_hits(body, query, case_sensitive)
+            if hits:
+                results.append({"path": path, "score": round(-rank, 4) or 0.0, "hits": hits})
+            if len(results) >= limit:
+                break
+        return results
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _find_hits(body: str, query: str, case_sensitive: bool) -> list[dict]:
+    needle = query if case_sensitive else query.lower()
+    hits = []
+    for line_no, line in enumerate(body.splitlines(), start=1):
+        haystack = line if case_sensitive else line.lower()
+        col = haystack.find(needle)
+        while col != -1:
+            hits.append({"line": line_no, "column": col + 1, "text": line.strip()[:200]})
+            if len(hits) >= MAX_HITS_PER_FILE:
+                return hits
+            col = haystack.find(needle, col + 1)
+    return hits
@@ -1,8 +1,515 @@
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import FastMCP, Context
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import base64
+import collections
+import fnmatch
+import functools
+import hashlib
+import itertools
+import json
+import mmap
 import os
+import shutil
+import stat
+import tempfile
+import threading
+
+from file_cache import FileCache
+from merkle_tree import MerkleStore
+from search_index import SearchIndex
 
 mcp = FastMCP(name="FileSystemAssistant")
 
+READ_CHUNK_SIZE = 64 * 1024          # bytes per progress step in stream_file
+STREAM_MAX_BYTES = 1024 * 1024       # bytes returned per stream_file call
+LIST_PAGE_SIZE = 1000                # entries per list_files page
+LIST_MAX_PAGE_SIZE = 10000
+LIST_MAX_DEPTH = 16                  # hard cap on recursive list_files
+CACHE_MAX_BYTES = 32 * 1024 * 1024   # memory budget for cached contents + listings
+CACHE_MAX_FILE_BYTES = 256 * 1024    # only files up to this size are cached
+LIST_CACHE_TTL = 2.0                 # seconds; bounds staleness of per-entry size/mtime
+LIST_ENTRY_COST = 200                # rough bytes per cached listing entry
+SEARCH_INDEX_DIR = os.environ.get(
+    "FS_INDEX_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mcp-file-server"))
+INDEX_REFRESH_INTERVAL = 5.0         # seconds between mtime sweeps of an index
+
+cache = FileCache(CACHE_MAX_BYTES)
+
+TOOL_LIMITS = {                      # tool -> (max concurrent calls = its threads, timeout in seconds)
+    "list_files": (8, 30.0),
+    "read_file": (16, 30.0),
+    "stream_file": (4, 120.0),
+    "search_files": (4, 60.0),
+    "write_file": (8, 30.0),
+    "write_files": (4, 60.0),
+    "diff_tree": (2, 300.0),
+}
+
+# All blocking disk I/O runs on these threads, so a slow read never stalls the event loop.
+# Each tool has its own: a slow mount that ties up every read_file thread can't
+# make list_files or write_file queue behind it.
+io_pools = {name: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"fs-{name}")
+            for name, (limit, _) in TOOL_LIMITS.items()}
+
+_indexes = {}                        # absolute directory -> SearchIndex
+_indexes_lock = threading.Lock()
+_trees = {}                          # absolute directory -> MerkleStore
+_trees_lock = threading.Lock()
+
+_UMASK = os.umask(0)   # read the process umask once so new files get normal permissions
+os.umask(_UMASK)
+
+
+
+# ======================================================================
+#                       helpers
+#=======================================================================
+
+def _map_file(f):
+    """mmap an open binary file read-only (None for empty files, which can't be mapped)."""
+    if os.fstat(f.fileno()).st_size == 0:
+        return None
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _utf8_boundary(buf, start: int, end: int) -> int:
+    """Move `end` back so it doesn't split a multi-byte UTF-8 character."""
+    if end >= len(buf):
+        return end
+    back = end
+    while back > start and end - back < 3 and (buf[back] & 0xC0) == 0x80:
+        back -= 1
+    return back if back > start else end
+
+
+def _line_span(mm, start_line: int, end_line: int | None) -> tuple[int, int]:
+    """Byte span covering lines start_line..end_line (1-based, inclusive)."""
+    size = len(mm)
+    pos = 0
+    for _ in range(start_line - 1):
+        nl = mm.find(b"\n", pos)
+        if nl == -1:
+            return size, size
+        pos = nl + 1
+    if end_line is None:
+        return pos, size
+    end = pos
+    for _ in range(end_line - start_line + 1):
+        nl = mm.find(b"\n", end)
+        if nl == -1:
+            return pos, size
+        end = nl + 1
+    return pos, end
+
+
+def _make_cursor(offset: int, st: os.stat_result) -> str:
+    return f"{offset}:{st.st_mtime_ns}"
+
+
+def _parse_cursor(cursor: str, st: os.stat_result) -> int:
+    offset, _, mtime_ns = cursor.partition(":")
+    if mtime_ns != str(st.st_mtime_ns):
+        raise ValueError("file changed since cursor was issued, restart from the beginning")
+    return int(offset)
+
+
+def _entry_type(entry: os.DirEntry) -> str:
+    # is_dir / is_file / is_symlink answer from the dirent type, no extra stat call
+    if entry.is_symlink():
+        return "symlink"
+    if entry.is_dir(follow_symlinks=False):
+        return "dir"
+    if entry.is_file(follow_symlinks=False):
+        return "file"
+    return "other"
+
+
+def _encode_listing_cursor(frames: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(frames).encode()).decode()
+
+
+def _decode_listing_cursor(cursor: str) -> list:
+    frames = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if not isinstance(frames, list) or not all(
+        isinstance(f, list) and len(f) == 3 and isinstance(f[0], str)
+        and isinstance(f[1], int) and isinstance(f[2], int)
+        for f in frames
+    ):
+        raise ValueError("invalid cursor")
+    return frames
+
+
+def _dir_mtime_ns(root: str, rel: str) -> int:
+    return os.stat(os.path.join(root, rel) if rel else root).st_mtime_ns
+
+
+def _walk_entries(root: str, frames: list, max_depth: int):
+    """Depth-first scandir walk that can resume from a saved position.
+
+    `frames` is a stack of [relative_dir, entries_consumed, dir_mtime_ns]. It
+    is updated in place as the walk goes, so after each yielded entry it
+    describes exactly where to pick up again, and holds O(depth) state only.
+    Resuming is only safe if no directory on the stack gained or lost entries
+    (that bumps its mtime); otherwise entries would be skipped or repeated.
+    """
+    iters = []
+    try:
+        for rel, consumed, mtime_ns in frames:
+            if _dir_mtime_ns(root, rel) != mtime_ns:
+                raise ValueError("directory changed since cursor was issued, restart from the beginning")
+            it = os.scandir(os.path.join(root, rel) if rel else root)
+            iters.append(it)
+            collections.deque(itertools.islice(it, consumed), maxlen=0)
+        while iters:
+            entry = next(iters[-1], None)
+            if entry is None:
+                iters.pop().close()
+                frames.pop()
+                continue
+            frames[-1][1] += 1
+            rel = frames[-1][0]
+            if len(frames) <= max_depth and entry.is_dir(follow_symlinks=False):
+                child = os.path.join(rel, entry.name)
+                try:
+                    mtime_ns = _dir_mtime_ns(root, child)     # before reading: a change mid-scan is caught
+                    iters.append(os.scandir(os.path.join(root, child)))
+                    frames.append([child, 0, mtime_ns])
+                except OSError:
+                    pass  # unreadable subdirectory: still list it, just don't descend
+            yield entry, rel
+    finally:
+        for it in iters:
+            it.close()
+
+
+def _stat_etag(st: os.stat_result, variant: str = "") -> str:
+    # mtime + size identify a file version without reading it (like nginx ETags)
+    tag = f"{st.st_mtime_ns:x}-{st.st_size:x}"
+    return f'"{tag}-{variant}"' if variant else f'"{tag}"'
+
+
+def _digest_etag(page: dict) -> str:
+    body = json.dumps([page["entries"], page["next_cursor"]], sort_keys=True).encode()
+    return f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def _dirs_unchanged(root: str, dirs: tuple) -> bool:
+    """Adding, removing or renaming an entry bumps its directory's mtime."""
+    try:
+        return all(os.stat(os.path.join(root, rel) if rel else root).st_mtime_ns == mtime_ns
+                   for rel, mtime_ns in dirs)
+    except OSError:
+        return False
+
+
+def _write_temp(path: str, data: bytes) -> str:
+    """Write `data` to a fsync'd temp file next to `path` and return its name.
+
+    `path` must already be resolved (realpath): the temp file has to live in
+    the same directory as the file it replaces for the rename to be atomic.
+    """
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"directory does not exist: {directory}")
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            os.chmod(tmp, 0o666 & ~_UMASK)
+        else:
+            shutil.copymode(path, tmp)
+            if (st.st_uid, st.st_gid) != (os.getuid(), os.getgid()):
+                try:
+                    os.chown(tmp, st.st_uid, st.st_gid)
+                except PermissionError:
+                    pass      # only root can give a file away; keep ours rather than fail the write
+        return tmp
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _fsync_dir(directory: str):
+    # Makes the rename itself durable. Directories can't be opened on Windows.
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _commit_files(files: dict) -> dict:
+    """Atomically replace each path with its new bytes.
+
+    Every file goes to a temp file + fsync first, then all of them are
+    renamed into place, then each touched directory is fsync'd once, so N
+    files in one folder cost N file fsyncs + 1 directory fsync.
+    A symlink is written through, like open(path, "w") would: the file it
+    points to is replaced and the link stays a link. (A hard-linked file
+    still gets a new inode - the price of an atomic rename.)
+    Returns {path: error message} for files that could not be written.
+    """
+    errors = {}
+    staged = []
+    for path, data in files.items():
+        real = os.path.realpath(path)
+        try:
+            staged.append((path, real, _write_temp(real, data)))
+        except Exception as e:
+            errors[path] = str(e)
+    directories = set()
+    for path, real, tmp in staged:
+        try:
+            os.replace(tmp, real)
+            directories.add(os.path.dirname(real))
+        except Exception as e:
+            errors[path] = str(e)
+            os.unlink(tmp)
+        for name in {os.path.abspath(path), real}:
+            cache.invalidate(name)
+            _reindex(name)
+    for directory in directories:
+        try:
+            _fsync_dir(directory)
+        except OSError:
+            pass
+    return errors
+
+
+def _get_index(directory: str) -> SearchIndex:
+    root = os.path.abspath(directory)
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            if not os.path.isdir(root):
+                raise NotADirectoryError(f"not a directory: {directory}")
+            index = SearchIndex(root, _state_db(root, ".db"), INDEX_REFRESH_INTERVAL)
+            _indexes[root] = index
+        return index
+
+
+def _state_db(root: str, suffix: str) -> str:
+    os.makedirs(SEARCH_INDEX_DIR, exist_ok=True)
+    name = hashlib.blake2b(root.encode(), digest_size=8).hexdigest()
+    return os.path.join(SEARCH_INDEX_DIR, f"{name}{suffix}")
+
+
+def _get_tree(directory: str) -> MerkleStore:
+    root = os.path.abspath(directory)
+    with _trees_lock:
+        tree = _trees.get(root)
+        if tree is None:
+            if not os.path.isdir(root):
+                raise NotADirectoryError(f"not a directory: {directory}")
+            tree = MerkleStore(root, _state_db(root, ".merkle.db"))
+            _trees[root] = tree
+        return tree
+
+
+def _reindex(path: str):
+    """Keep every open search index that covers `path` in step with a write."""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        try:
+            index.update_file(path)
+        except Exception:
+            index.last_refresh = 0.0   # fall back to the next mtime sweep
+
+
+def _read_existing(path: str) -> str | None:
+    # same encoding as the write side, and newline="" keeps CRLFs as they are:
+    # an append or patch changes only the bytes it targets
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _apply_op(current: str | None, op: dict) -> str:
+    kind = op.get("op", "write")
+    if kind == "write":
+        return op["content"]
+    if kind == "append":
+        return (current or "") + op["content"]
+    if kind == "patch":
+        if current is None:
+            raise FileNotFoundError("cannot patch a file that does not exist")
+        old, new = op["old"], op["new"]
+        found = current.count(old) if old else 0
+        if found != 1:
+            raise ValueError(f"patch 'old' text must match exactly once, matched {found} times")
+        return current.replace(old, new, 1)
+    raise ValueError(f"unknown op '{kind}', expected write, append or patch")
+
+
+def _read_text_cached(path: str, st: os.stat_result) -> str:
+    if st.st_size > CACHE_MAX_FILE_BYTES:
+        with open(path, "r") as f:
+            return f.read()
+    key = ("file", os.path.abspath(path))
+    version = (st.st_mtime_ns, st.st_size)
+    content = cache.get(key, lambda cached: cached == version)
+    if content is None:
+        with open(path, "r") as f:
+            content = f.read()
+        cache.put(key, content, version, cost=len(content))
+    return content
+
+
+def _list_page(root: str, pattern: str | None, depth: int, limit: int,
+               cursor: str | None) -> tuple[dict, tuple]:
+    """Build one list_files page plus the (dir, mtime_ns) pairs it depends on."""
+    frames = _decode_listing_cursor(cursor) if cursor else [["", 0, _dir_mtime_ns(root, "")]]
+    visited = {rel for rel, _, _ in frames}
+    match_path = pattern is not None and "/" in pattern
+
+    entries = []
+    walker = _walk_entries(root, frames, depth)
+    for entry, rel in walker:
+        visited.add(rel)
+        rel_path = os.path.join(rel, entry.name)
+        if pattern and not fnmatch.fnmatch(rel_path if match_path else entry.name, pattern):
+            continue
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue              # removed while we were walking: skip it, not the whole page
+        entries.append({
+            "name": entry.name,
+            "path": rel_path,
+            "type": _entry_type(entry),
+            "size": st.st_size if not stat.S_ISDIR(st.st_mode) else None,
+            "mtime": st.st_mtime,
+        })
+        if len(entries) >= limit:
+            break
+    walker.close()
+    visited.update(rel for rel, _, _ in frames)
+
+    dirs = []
+    for rel in sorted(visited):
+        try:
+            dirs.append((rel, os.stat(os.path.join(root, rel) if rel else root).st_mtime_ns))
+        except OSError:
+            pass
+    page = {
+        "entries": entries,
+        "next_cursor": _encode_listing_cursor(frames) if frames else None,
+    }
+    return page, tuple(dirs)
+
+
+def _read_range(path: str, offset: int, length: int | None) -> str:
+    with open(path, "rb") as f:
+        mm = _map_file(f)
+        if mm is None:
+            return ""
+        with mm:
+            if offset < 0 or offset > len(mm):
+                raise ValueError(f"offset {offset} is outside the file (size {len(mm)})")
+            end = len(mm) if length is None else min(len(mm), offset + max(length, 0))
+            return mm[offset:end].decode("utf-8", errors="replace")
+
+
+def _read_lines(path: str, start_line: int, end_line: int | None) -> str:
+    if start_line < 1 or (end_line is not None and end_line < start_line):
+        raise ValueError("line range must satisfy 1 <= start_line <= end_line")
+    with open(path, "rb") as f:
+        mm = _map_file(f)
+        if mm is None:
+            return ""
+        with mm:
+            start, end = _line_span(mm, start_line, end_line)
+            return mm[start:end].decode("utf-8", errors="replace")
+
+
+
+async def _in_pool(tool: str, fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(io_pools[tool], functools.partial(fn, *args))
+
+
+async def _acquire(gate: asyncio.Semaphore, timeout: float) -> bool:
+    """Take a slot within `timeout`; never leaves a slot taken on timeout or cancel."""
+    acquire = asyncio.ensure_future(gate.acquire())
+    try:
+        await asyncio.wait((acquire,), timeout=max(timeout, 0))
+    except asyncio.CancelledError:
+        if not acquire.cancel():
+            gate.release()
+        raise
+    return not acquire.cancel()      # cancel() fails only if the slot was already ours
+
+
+def _error_result(fn, message: str):
+    # same shape the tool itself uses for errors: {"error": ...} for dict tools, text otherwise
+    if fn.__annotations__.get("return") is dict:
+        return {"error": f"Error: {message}"}
+    return f"Error: {message}"
+
+
+def offload(fn):
+    """Run a tool's blocking body on its own threads, within its TOOL_LIMITS.
+
+    At most N calls of the same tool run at once (the rest wait their turn),
+    and a call that takes longer than its timeout, waiting included, returns
+    an error instead of hanging the client. Python can't kill a thread, so a
+    timed-out read still finishes in the background, and it keeps its slot
+    until it does: stuck threads never pile up past the tool's limit.
+    Async tools keep running on the event loop and only get the limits.
+    """
+    name = fn.__name__
+    limit, timeout = TOOL_LIMITS[name]
+    gate = asyncio.Semaphore(limit)
+    timed_out = f"{name} timed out after {timeout:g}s"
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        if not await _acquire(gate, timeout):
+            return _error_result(fn, f"{timed_out} waiting for a free slot")
+
+        if asyncio.iscoroutinefunction(fn):
+            try:
+                return await asyncio.wait_for(fn(*args, **kwargs), deadline - loop.time())
+            except asyncio.TimeoutError:
+                return _error_result(fn, timed_out)
+            finally:
+                gate.release()
+
+        future = loop.run_in_executor(io_pools[name], functools.partial(fn, *args, **kwargs))
+        future.add_done_callback(lambda _: gate.release())    # the slot is free when the thread is
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), deadline - loop.time())
+        except asyncio.TimeoutError:
+            return _error_result(fn, timed_out)
+
+    return wrapper
+
+
+def _open_mapped(path: str):
+    f = open(path, "rb")
+    try:
+        return f, os.fstat(f.fileno()), _map_file(f)
+    except BaseException:
+        f.close()
+        raise
+
+
+def _read_chunk(mm, pos: int, stop: int, chunk_size: int) -> tuple[str, int]:
+    end = _utf8_boundary(mm, pos, min(stop, pos + chunk_size))
+    return mm[pos:end].decode("utf-8", errors="replace"), end
+
 
 
 # ======================================================================
@@ -10,35 +517,254 @@ mcp = FastMCP(name="FileSystemAssistant")
 #=======================================================================
 
 @mcp.tool()
-def list_files(directory: str) -> list:
-    """List all files in a directory."""
+@offload
+def list_files(directory: str, pattern: str | None = None, recursive: bool = False,
+               max_depth: int = 4, limit: int = LIST_PAGE_SIZE,
+               cursor: str | None = None, if_none_match: str | None = None) -> dict:
+    """List files in a directory, one page at a time, with size/mtime/type.
+
+    Args:
+        directory: Directory to list.
+        pattern: Optional glob (e.g. "*.py"). Matched against the entry name,
+            or against the relative path if the pattern contains "/".
+        recursive: Also walk subdirectories.
+        max_depth: How many directory levels to descend when recursive.
+        limit: Maximum entries per page.
+        cursor: `next_cursor` from the previous page.
+        if_none_match: `etag` from an earlier identical call. If the page is
+            unchanged only {"etag", "not_modified": true} is returned.
+    """
     try:
-        print(os.listdir(directory))
-        return os.listdir(directory)
+        limit = max(1, min(limit, LIST_MAX_PAGE_SIZE))
+        depth = max(0, min(max_depth, LIST_MAX_DEPTH)) if recursive else 0
+        root = os.path.abspath(directory)
+        key = ("list", root, pattern, depth, limit, cursor)
+
+        page = cache.get(key, lambda dirs: _dirs_unchanged(root, dirs))
+        if page is None:
+            page, dirs = _list_page(root, pattern, depth, limit, cursor)
+            page["etag"] = _digest_etag(page)
+            cache.put(key, page, dirs, cost=LIST_ENTRY_COST * (len(page["entries"]) + 1),
+                      ttl=LIST_CACHE_TTL)
+        if if_none_match is not None and if_none_match == page["etag"]:
+            return {"directory": directory, "etag": page["etag"], "not_modified": True}
+        return {"directory": directory, **page}
     except Exception as e:
-        return [f"Error: {str(e)}"]
+        return {"error": f"Error: {str(e)}"}
 
 
 @mcp.tool()
-def read_file(path: str) -> str:
-    """Read content of a file."""
+@offload
+def read_file(path: str, offset: int = 0, length: int | None = None,
+              start_line: int | None = None, end_line: int | None = None,
+              if_none_match: str | None = None) -> str | dict:
+    """Read content of a file, optionally just a byte range or a line range.
+
+    Args:
+        path: File to read.
+        offset: Byte offset to start reading from.
+        length: Number of bytes to read (default: up to end of file).
+        start_line: First line to return (1-based). Enables line-range mode.
+        end_line: Last line to return (inclusive, default: last line).
+        if_none_match: Conditional read. When given, the reply is
+            {"etag", "content"}; if it equals the current etag the reply is
+            just {"etag", "not_modified": true}. Pass "" to get a first etag.
+    """
     try:
-        with open(path, "r") as f:
-            return f.read()
+        st = os.stat(path)
+        if start_line is not None or end_line is not None:
+            etag = _stat_etag(st, f"L{start_line or 1}-{end_line or ''}")
+        elif offset or length is not None:
+            etag = _stat_etag(st, f"B{offset}-{'' if length is None else length}")
+        else:
+            etag = _stat_etag(st)
+        if if_none_match is not None and if_none_match == etag:
+            return {"etag": etag, "not_modified": True}
+
+        if start_line is not None or end_line is not None:
+            content = _read_lines(path, start_line or 1, end_line)
+        elif offset or length is not None:
+            content = _read_range(path, offset, length)
+        else:
+            content = _read_text_cached(path, st)
+
+        if if_none_match is not None:
+            return {"etag": etag, "content": content}
+        return content
     except Exception as e:
         return f"Error: {str(e)}"
 
 
 @mcp.tool()
+@offload
+async def stream_file(path: str, ctx: Context, cursor: str | None = None,
+                      chunk_size: int = READ_CHUNK_SIZE,
+                      max_bytes: int = STREAM_MAX_BYTES) -> dict:
+    """Read a large file chunk by chunk, reporting progress after each chunk.
+
+    Returns at most `max_bytes` of content plus a `next_cursor`. Pass the
+    cursor back to continue where this call stopped; it is None at end of file.
+
+    Args:
+        path: File to read.
+        cursor: Continuation cursor from a previous call (omit to start at the beginning).
+        chunk_size: Bytes read between progress notifications.
+        max_bytes: Upper bound on bytes returned by this call.
+    """
+    try:
+        chunk_size = max(1, chunk_size)
+        f, st, mm = await _in_pool("stream_file", _open_mapped, path)
+        try:
+            offset = _parse_cursor(cursor, st) if cursor else 0
+            size = len(mm) if mm is not None else 0
+            if offset < 0 or offset > size:
+                raise ValueError(f"cursor offset {offset} is outside the file (size {size})")
+            stop = min(size, offset + max(1, max_bytes))
+            parts = []
+            pos = offset
+            while pos < stop:
+                text, pos = await _in_pool("stream_file", _read_chunk, mm, pos, stop, chunk_size)
+                parts.append(text)
+                await ctx.report_progress(pos, size, f"read {pos}/{size} bytes")
+        finally:
+            if mm is not None:
+                mm.close()
+            f.close()
+        eof = pos >= size
+        return {
+            "path": path,
+            "size": size,
+            "offset": offset,
+            "content": "".join(parts),
+            "next_cursor": None if eof else _make_cursor(pos, st),
+            "eof": eof,
+        }
+    except Exception as e:
+        return {"error": f"Error: {str(e)}"}
+
+
+@mcp.tool()
+@offload
+def search_files(query: str, directory: str, limit: int = 20,
+                 case_sensitive: bool = False) -> dict:
+    """Find files under a directory that contain some text.
+
+    Uses a persistent trigram index, so only files changed since the last
+    query are re-read. Results are ranked (best first) and list the
+    line/column of each hit.
+
+    Args:
+        query: Text to look for (plain substring, not a regex).
+        directory: Root directory to search.
+        limit: Maximum number of files to return.
+        case_sensitive: Match case exactly (default: ignore case).
+    """
+    try:
+        if not query:
+            raise ValueError("query must not be empty")
+        index = _get_index(directory)
+        refresh = index.refresh()
+        results = index.search(query, max(1, limit), case_sensitive)
+        return {
+            "directory": directory,
+            "query": query,
+            "results": results,
+            "reindexed": refresh["updated"] + refresh["removed"],
+        }
+    except Exception as e:
+        return {"error": f"Error: {str(e)}"}
+
+
+@mcp.tool()
+@offload
+def diff_tree(directory: str, since: str | None = None, limit: int = 1000) -> dict:
+    """Report what changed in a directory since an earlier snapshot.
+
+    Hashes the directory into a Merkle tree (only files whose mtime/size
+    changed are re-hashed, in parallel) and returns its `root` hash. Pass a
+    previous `root` as `since` to get just the added/removed/modified paths;
+    an added or removed folder is reported once, not file by file.
+
+    Args:
+        directory: Directory to snapshot.
+        since: Root hash returned by an earlier diff_tree call.
+        limit: Maximum number of changes to return.
+    """
+    try:
+        tree = _get_tree(directory)
+        if since is not None and not tree.has_root(since):
+            raise ValueError(f"unknown root hash {since}; call without 'since' to take a fresh snapshot")
+        snap = tree.snapshot(pin=since)
+        result = {"directory": directory, "root": snap["root"], "since": since,
+                  "files": snap["files"], "rehashed": snap["rehashed"]}
+        if since is not None:
+            result["changes"], result["truncated"] = tree.diff(since, snap["root"], max(1, limit))
+        return result
+    except Exception as e:
+        return {"error": f"Error: {str(e)}"}
+
+
+@mcp.tool()
+@offload
 def write_file(path: str, content: str) -> str:
-    """Write content to a file."""
+    """Write content to a file (atomically: temp file + fsync + rename)."""
     try:
-        with open(path, "w") as f:
-            f.write(content)
+        errors = _commit_files({path: content.encode("utf-8")})
+        if errors:
+            return f"Error: {errors[path]}"
         return "File written successfully"
     except Exception as e:
         return f"Error: {str(e)}"
 
 
+@mcp.tool()
+@offload
+def write_files(ops: list[dict]) -> dict:
+    """Apply many writes, appends and patches in one call.
+
+    Each op is one of:
+        {"path": ..., "op": "write",  "content": ...}   create / overwrite
+        {"path": ..., "op": "append", "content": ...}   add to the end
+        {"path": ..., "op": "patch",  "old": ..., "new": ...}   replace text that occurs once
+
+    Ops on the same path are applied in order and the result is written
+    once. Every file is replaced atomically, so a crash never leaves a
+    half-written file. If any op on a path fails, that path is left untouched.
+    """
+    try:
+        pending = {}    # path -> new text
+        failed = {}     # path -> error
+        results = []
+        for i, op in enumerate(ops):
+            path, kind = op.get("path"), op.get("op", "write")
+            results.append({"index": i, "path": path, "op": kind})
+            if not path or path in failed:
+                continue
+            try:
+                if path not in pending:
+                    pending[path] = None if kind == "write" else _read_existing(path)
+                pending[path] = _apply_op(pending[path], op)
+            except KeyError as e:
+                failed[path] = f"missing field {e}"
+            except Exception as e:
+                failed[path] = str(e)
+
+        files = {path: text.encode("utf-8") for path, text in pending.items() if path not in failed}
+        failed.update(_commit_files(files))
+
+        for result in results:
+            error = failed.get(result["path"]) if result["path"] else "missing 'path'"
+            result["ok"] = error is None
+            if error is not None:
+                result["error"] = error
+        return {
+            "results": results,
+            "written": len([p for p in files if p not in failed]),
+            "failed": len(failed),
+        }
+    except Exception as e:
+        return {"error": f"Error: {str(e)}"}
+
+
 if __name__ == "__main__":
-    mcp.run()
\ No newline at end of file
+    mcp.run()
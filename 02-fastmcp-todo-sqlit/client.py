@@ -1,4 +1,4 @@
-from mcp import ClientSession, StdioServerParameters
+from mcp import ClientSession, StdioServerParameters, types
 from mcp.client.stdio import stdio_client
 import asyncio
 import sys
@@ -9,6 +9,24 @@ python_executable = sys.executable
 # Path to the server script
 server_script = "server.py"
 
+# Set by the server's resources/updated notification for todo://list
+list_changed = asyncio.Event()
+
+async def handle_message(message):
+    if isinstance(message, types.ServerNotification) and \
+            isinstance(message.root, types.ResourceUpdatedNotification):
+        list_changed.set()
+
+async def read_if_changed(session, cached):
+    """Re-read todo://list only if the server said it changed."""
+    try:
+        await asyncio.wait_for(list_changed.wait(), timeout=1.0)
+    except asyncio.TimeoutError:
+        return cached
+    list_changed.clear()
+    resource_content = await session.read_resource("todo://list")
+    return resource_content.contents[0].text
+
 async def main():
     # Define server parameters
     server_params = StdioServerParameters(
@@ -17,9 +35,11 @@ async def main():
     )
 
     async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
+        async with ClientSession(read, write, message_handler=handle_message) as session:
             # Initialize connection
             await session.initialize()
+            # Ask to be told when the list changes, instead of re-reading it after every call
+            await session.subscribe_resource("todo://list")
 
             # 1. Add a todo
             print("--- Adding a todo ---")
@@ -28,26 +48,23 @@ async def main():
 
             # 2. List todos (using resource)
             print("\n--- Listing todos ---")
-            # We don't have direct resource reading in ClientSession high-level API easily for this demo in one line
-            # usually, but let's check tools first. 
-            # Actually, `read_resource` is a method on session.
-            # Resources are accessed by URI.
             try:
-                # Based on FastMCP default resource format. We defined 'todo://list' in server.py
-                # Note: FastMCP might need the template syntax or direct URI. 
-                # Let's try reading the resource.
+                # todo://list returns JSON: {"todos": [...], "next_after_id": ...}
                 resource_content = await session.read_resource("todo://list")
-                print(f"Todos: {resource_content.contents[0].text}")
+                todos = resource_content.contents[0].text
+                list_changed.clear()
+                print(f"Todos: {todos}")
             except Exception as e:
                 print(f"Error reading resource: {e}")
+                todos = None
 
             # 3. Add another todo
             await session.call_tool("add_todo", arguments={"title": "Walk the dog"})
             
-            # 4. List again
+            # 4. List again (only fetched if the server notified us)
             print("\n--- Listing todos after adding another ---")
-            resource_content = await session.read_resource("todo://list")
-            print(f"Todos: {resource_content.contents[0].text}")
+            todos = await read_if_changed(session, todos)
+            print(f"Todos: {todos}")
 
             # 5. Complete a todo (Assuming ID 1 is the first one, since we just initialized DB)
             # We need to parse the JSON really to get IDs, but for simplicity let's assume ID 1.
@@ -57,8 +74,8 @@ async def main():
 
             # 6. List final state
             print("\n--- Listing todos after completion ---")
-            resource_content = await session.read_resource("todo://list")
-            print(f"Todos: {resource_content.contents[0].text}")
+            todos = await read_if_changed(session, todos)
+            print(f"Todos: {todos}")
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,97 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Applied to every new connection. WAL lets readers and the writer work at the
+# same time. synchronous=NORMAL skips an fsync per commit: the database always stays
+# consistent, but the last few commits can be lost on power loss or an OS crash.
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,              # ms to wait for a lock instead of failing at once
+    "cache_size": -16000,              # negative = KiB, so 16 MB of page cache per connection
+    "mmap_size": 256 * 1024 * 1024,    # read pages straight from the OS page cache
+    "temp_store": "MEMORY",
+}
+STATEMENT_CACHE_SIZE = 256             # prepared statements kept per connection
+
+
+class ConnectionPool:
+    """A small pool of long-lived SQLite connections.
+
+    Opening a connection and applying pragmas on every tool call is most of
+    the cost of a tiny query. Connections here are created lazily up to
+    `size`, then reused; each keeps its own prepared-statement cache, so
+    repeated queries skip SQL parsing too.
+    """
+
+    def __init__(self, path: str, size: int = 4):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()     # LIFO: the warmest connection is reused first
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row
+        for name, value in PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+        return self._idle.get()
+
+    def _release(self, conn: sqlite3.Connection):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for reads."""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self, immediate: bool = False):
+        """Borrow a connection; commit if the block succeeds, roll back if it raises.
+
+        `immediate=True` takes the write lock up front (BEGIN IMMEDIATE), so
+        reads done inside the block can't be invalidated by another writer.
+        """
+        conn = self._acquire()
+        try:
+            if immediate:
+                conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._release(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
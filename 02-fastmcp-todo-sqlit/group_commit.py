@@ -0,0 +1,76 @@
+import asyncio
+
+from db import ConnectionPool
+
+
+class GroupCommitWriter:
+    """Funnels writes from many concurrent tool calls through one writer task.
+
+    Each `submit()` queues an op and waits for its result. The writer picks
+    up the first queued op, waits up to `max_delay` seconds for more to
+    arrive (or until `max_batch` are queued), then runs the whole batch in
+    ONE transaction on a worker thread, so N callers share one lock
+    acquisition and one commit. Every op runs inside its own SAVEPOINT, so
+    one failing op is rolled back alone and the rest still commit.
+    """
+
+    def __init__(self, pool: ConnectionPool, max_batch: int = 256, max_delay: float = 0.002):
+        self.pool = pool
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.ops = 0
+        self._queue = None
+        self._full = None
+        self._task = None
+
+    async def submit(self, op, *args):
+        """Run `op(conn, *args)` in the next group commit and return its result."""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._full = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((op, args, future))
+        if self._queue.qsize() >= self.max_batch:
+            self._full.set()
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            if self._queue.qsize() + 1 < self.max_batch:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            self._full.clear()
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                outcomes = await asyncio.to_thread(self._commit, batch)
+            except Exception as e:             # the commit itself failed: nothing was written
+                outcomes = [(False, e)] * len(batch)
+            for (_, _, future), (ok, value) in zip(batch, outcomes):
+                if future.done():              # caller went away (cancelled)
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    def _commit(self, batch: list) -> list:
+        outcomes = []
+        with self.pool.transaction(immediate=True) as conn:
+            for op, args, _ in batch:
+                conn.execute("SAVEPOINT group_op")
+                try:
+                    outcomes.append((True, op(conn, *args)))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO group_op")
+                    outcomes.append((False, e))
+                conn.execute("RELEASE group_op")
+        self.batches += 1
+        self.ops += len(batch)
+        return outcomes
@@ -1,91 +1,432 @@
 from mcp.server.fastmcp import FastMCP, Context
-import sqlite3
+from mcp.server.fastmcp.resources import ResourceTemplate
+import asyncio
+import collections
+import json
+import os
+import re
+import weakref
 from typing import List, Dict, Any
+from urllib.parse import parse_qsl
+
+from db import ConnectionPool
+from group_commit import GroupCommitWriter
 
 # Initialize FastMCP server
 mcp = FastMCP("sqlite-todo")
 
 DB_PATH = "todos.db"
 
-def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+MAX_BATCH_SIZE = 50000
+LIST_PAGE_SIZE = 100
+LIST_MAX_PAGE_SIZE = 1000
+
+# Write-behind mode: single-item writes from concurrent callers are batched
+# into group commits (flushed at GROUP_COMMIT_MAX_BATCH ops or after MAX_DELAY s).
+WRITE_BEHIND = os.environ.get("TODO_WRITE_BEHIND", "0") == "1"
+GROUP_COMMIT_MAX_BATCH = 256
+GROUP_COMMIT_MAX_DELAY = 0.002
+LIST_CACHE_ENTRIES = 128               # serialized todo://list pages kept in memory
+SEARCH_MAX_RESULTS = 200
+
+# Long-lived connections (WAL mode, tuned pragmas) shared by every tool call
+pool = ConnectionPool(DB_PATH, size=4)
+writer = GroupCommitWriter(pool, GROUP_COMMIT_MAX_BATCH, GROUP_COMMIT_MAX_DELAY) if WRITE_BEHIND else None
 
 def initialize_db():
     """Initialize the database with the todos table if it doesn't exist."""
-    conn = get_db_connection()
-    conn.execute('''
-        CREATE TABLE IF NOT EXISTS todos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            completed BOOLEAN NOT NULL DEFAULT 0
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    with pool.transaction() as conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS todos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                completed BOOLEAN NOT NULL DEFAULT 0
+            )
+        ''')
+        # Entries are ordered (completed, rowid), so "WHERE completed = ? AND id > ?
+        # ORDER BY id" is a range scan on this index — no sort, no table scan.
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_todos_completed ON todos (completed)')
+
+        # Full-text index over titles. External-content FTS5: it stores only the index and
+        # reads titles from `todos`; the triggers keep it in step with every write.
+        fts_exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'todos_fts'").fetchone()
+        conn.executescript('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5(
+                title, content='todos', content_rowid='id', prefix='2 3'
+            );
+            CREATE TRIGGER IF NOT EXISTS todos_fts_insert AFTER INSERT ON todos BEGIN
+                INSERT INTO todos_fts (rowid, title) VALUES (new.id, new.title);
+            END;
+            CREATE TRIGGER IF NOT EXISTS todos_fts_delete AFTER DELETE ON todos BEGIN
+                INSERT INTO todos_fts (todos_fts, rowid, title) VALUES ('delete', old.id, old.title);
+            END;
+            CREATE TRIGGER IF NOT EXISTS todos_fts_update AFTER UPDATE OF title ON todos BEGIN
+                INSERT INTO todos_fts (todos_fts, rowid, title) VALUES ('delete', old.id, old.title);
+                INSERT INTO todos_fts (rowid, title) VALUES (new.id, new.title);
+            END;
+        ''')
+        if not fts_exists:
+            # first run on an existing database: index the rows that are already there
+            conn.execute("INSERT INTO todos_fts (todos_fts) VALUES ('rebuild')")
 
 # Initialize DB on startup
 initialize_db()
 
-@mcp.resource("todo://list")
+# --- Bulk helpers (run inside one transaction) ---
+
+def _insert_many(conn, titles: list) -> list:
+    """Insert titles with one executemany and return their new IDs in order."""
+    conn.executemany('INSERT INTO todos (title) VALUES (?)', [(t,) for t in titles])
+    # The write lock is held for the whole transaction, so AUTOINCREMENT handed
+    # out a consecutive block of IDs ending at last_insert_rowid().
+    last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+    return list(range(last_id - len(titles) + 1, last_id + 1))
+
+def _existing_ids(conn, ids: list) -> set:
+    rows = conn.execute('SELECT id FROM todos WHERE id IN (SELECT value FROM json_each(?))',
+                        (json.dumps(ids),))
+    return {row[0] for row in rows}
+
+def _complete_many(conn, ids: list) -> set:
+    found = _existing_ids(conn, ids)
+    conn.executemany('UPDATE todos SET completed = 1 WHERE id = ?', [(i,) for i in found])
+    return found
+
+def _delete_many(conn, ids: list) -> set:
+    found = _existing_ids(conn, ids)
+    conn.executemany('DELETE FROM todos WHERE id = ?', [(i,) for i in found])
+    return found
+
+def _id_results(ids: list, found: set, once: bool = False) -> list:
+    """Per-ID results; with `once`, a repeated ID only succeeds the first time (deletes)."""
+    results, used = [], set()
+    for todo_id in ids:
+        ok = todo_id in found and not (once and todo_id in used)
+        used.add(todo_id)
+        results.append({"id": todo_id, "ok": True} if ok else
+                       {"id": todo_id, "ok": False, "error": "not found"})
+    return results
+
+def _check_batch(items: list):
+    if len(items) > MAX_BATCH_SIZE:
+        raise ValueError(f"batch too large: {len(items)} items (max {MAX_BATCH_SIZE})")
+
+def _summary(results: list) -> dict:
+    succeeded = sum(1 for r in results if r["ok"])
+    return {"results": results, "succeeded": succeeded, "failed": len(results) - succeeded}
+
+class QueryResourceTemplate(ResourceTemplate):
+    """Resource template with RFC 6570 form-style query params, e.g. `todo://list{?limit}`.
+
+    FastMCP's own templates only match `{name}` path segments, so this one
+    matches the part before `{?` exactly and reads the params from the
+    query string. Every param is optional; unknown params don't match.
+    """
+
+    def matches(self, uri: str) -> dict[str, Any] | None:
+        base, _, query = str(uri).partition("?")
+        expected, _, names = self.uri_template.partition("{?")
+        if base != expected:
+            return None
+        allowed = set(re.findall(r"\w+", names))
+        params = dict(parse_qsl(query))
+        if not params.keys() <= allowed:
+            return None
+        return params
+
+def query_resource(uri_template: str, mime_type: str = "application/json"):
+    """Like @mcp.resource(), for a URI template with `{?...}` query params."""
+    def decorator(fn):
+        template = QueryResourceTemplate.from_function(fn, uri_template=uri_template,
+                                                       mime_type=mime_type)
+        mcp._resource_manager._templates[uri_template] = template
+        return fn
+    return decorator
+
+# --- todo://list cache + change notifications ---
+
+_list_cache = collections.OrderedDict()   # (completed, after_id, limit) -> JSON page
+_list_generation = 0                      # bumped on every write; stale reads aren't cached
+_subscribers = {}                         # uri -> WeakSet of sessions subscribed to it
+_pending_notifications = set()            # keeps notify tasks alive until they finish
+
+def _todos_changed():
+    """Call after any committed write: drop cached pages and tell subscribers."""
+    global _list_generation
+    _list_generation += 1
+    _list_cache.clear()
+    for uri, sessions in list(_subscribers.items()):
+        if uri.startswith("todo://list"):
+            for session in list(sessions):
+                task = asyncio.get_running_loop().create_task(_notify(session, uri))
+                _pending_notifications.add(task)
+                task.add_done_callback(_pending_notifications.discard)
+
+async def _notify(session, uri: str):
+    try:
+        await session.send_resource_updated(uri)
+    except Exception:
+        _subscribers.get(uri, weakref.WeakSet()).discard(session)   # client is gone
+
+@mcp._mcp_server.subscribe_resource()
+async def subscribe_resource(uri) -> None:
+    session = mcp._mcp_server.request_context.session
+    _subscribers.setdefault(str(uri), weakref.WeakSet()).add(session)
+
+@mcp._mcp_server.unsubscribe_resource()
+async def unsubscribe_resource(uri) -> None:
+    session = mcp._mcp_server.request_context.session
+    _subscribers.get(str(uri), weakref.WeakSet()).discard(session)
+
+# The SDK always reports resources.subscribe = False; we do support it now.
+_base_capabilities = mcp._mcp_server.get_capabilities
+
+def _capabilities_with_subscribe(*args, **kwargs):
+    capabilities = _base_capabilities(*args, **kwargs)
+    if capabilities.resources is not None:
+        capabilities.resources.subscribe = True
+    return capabilities
+
+mcp._mcp_server.get_capabilities = _capabilities_with_subscribe
+
+def _todo_page(completed: bool | None, after_id: int, limit: int) -> str:
+    """One page of todos with id > after_id, as JSON, using keyset pagination."""
+    limit = max(1, min(limit, LIST_MAX_PAGE_SIZE))
+    key = (completed, after_id, limit)
+    page = _list_cache.get(key)
+    if page is not None:
+        _list_cache.move_to_end(key)
+        return page
+
+    generation = _list_generation
+    sql = 'SELECT id, title, completed FROM todos WHERE id > ?'
+    params = [after_id]
+    if completed is not None:
+        sql += ' AND completed = ?'
+        params.append(int(completed))
+    sql += ' ORDER BY id LIMIT ?'
+    params.append(limit + 1)                # one extra row tells us if there's a next page
+    with pool.connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+
+    todos = [{"id": r["id"], "title": r["title"], "completed": bool(r["completed"])}
+             for r in rows[:limit]]
+    next_after_id = todos[-1]["id"] if len(rows) > limit else None
+    page = json.dumps({"todos": todos, "next_after_id": next_after_id}, separators=(",", ":"))
+    if generation == _list_generation:
+        _list_cache[key] = page
+        if len(_list_cache) > LIST_CACHE_ENTRIES:
+            _list_cache.popitem(last=False)
+    return page
+
+@mcp.resource("todo://list", mime_type="application/json")
 def list_todos() -> str:
-    """List all todos in the database as a JSON string."""
-    conn = get_db_connection()
-    todos = conn.execute('SELECT * FROM todos').fetchall()
-    conn.close()
-    
-    todo_list = [dict(todo) for todo in todos]
-    return str(todo_list)
+    """First page of todos as JSON. Use todo://list{?completed,after_id,limit} for more."""
+    return _todo_page(None, 0, LIST_PAGE_SIZE)
+
+@query_resource("todo://list{?completed,after_id,limit}")
+def list_todos_page(completed: bool | None = None, after_id: int = 0,
+                    limit: int = LIST_PAGE_SIZE) -> str:
+    """A page of todos as JSON: {"todos": [...], "next_after_id": ...}.
+
+    Pass `next_after_id` back as `after_id` to get the next page.
+    `completed=true/false` filters by status.
+    """
+    return _todo_page(completed, after_id, limit)
+
+# --- Single-item writes (direct, or through the group-commit writer) ---
+
+def _insert_one(conn, title: str) -> int:
+    return conn.execute('INSERT INTO todos (title) VALUES (?)', (title,)).lastrowid
+
+def _complete_one(conn, todo_id: int) -> bool:
+    return conn.execute('UPDATE todos SET completed = 1 WHERE id = ?', (todo_id,)).rowcount > 0
+
+def _delete_one(conn, todo_id: int) -> bool:
+    return conn.execute('DELETE FROM todos WHERE id = ?', (todo_id,)).rowcount > 0
+
+async def _write(op, *args):
+    if writer is not None:
+        return await writer.submit(op, *args)
+    with pool.transaction() as conn:
+        return op(conn, *args)
 
 @mcp.tool()
-def add_todo(title: str) -> str:
+async def add_todo(title: str) -> str:
     """Add a new todo item.
-    
+
     Args:
         title: The title of the todo item.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('INSERT INTO todos (title) VALUES (?)', (title,))
-    conn.commit()
-    new_id = cursor.lastrowid
-    conn.close()
+    new_id = await _write(_insert_one, title)
+    _todos_changed()
     return f"Added todo with ID {new_id}: '{title}'"
 
 @mcp.tool()
-def complete_todo(todo_id: int) -> str:
+async def complete_todo(todo_id: int) -> str:
     """Mark a todo item as completed.
-    
+
     Args:
         todo_id: The ID of the todo item to complete.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('UPDATE todos SET completed = 1 WHERE id = ?', (todo_id,))
-    if cursor.rowcount == 0:
-        conn.close()
+    if not await _write(_complete_one, todo_id):
         return f"Todo with ID {todo_id} not found."
-    conn.commit()
-    conn.close()
+    _todos_changed()
     return f"Marked todo {todo_id} as completed."
 
 @mcp.tool()
-def delete_todo(todo_id: int) -> str:
+async def delete_todo(todo_id: int) -> str:
     """Delete a todo item.
-    
+
     Args:
         todo_id: The ID of the todo item to delete.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('DELETE FROM todos WHERE id = ?', (todo_id,))
-    if cursor.rowcount == 0:
-        conn.close()
+    if not await _write(_delete_one, todo_id):
         return f"Todo with ID {todo_id} not found."
-    conn.commit()
-    conn.close()
+    _todos_changed()
     return f"Deleted todo {todo_id}."
 
+@mcp.tool()
+def add_todos(titles: list[str]) -> dict:
+    """Add many todo items in a single transaction.
+
+    Args:
+        titles: Titles of the todo items to add.
+    """
+    try:
+        _check_batch(titles)
+        with pool.transaction(immediate=True) as conn:
+            ids = _insert_many(conn, titles)
+        summary = _summary([{"id": i, "title": t, "ok": True} for i, t in zip(ids, titles)])
+        if summary["succeeded"]:
+            _todos_changed()
+        return summary
+    except Exception as e:
+        return {"error": f"Error: {str(e)}"}
+
+@mcp.tool()
+def complete_todos(todo_ids: list[int]) -> dict:
+    """Mark many todo items as completed in a single transaction.
+
+    Args:
+        todo_ids: IDs of the todo items to complete.
+    """
+    try:
+        _check_batch(todo_ids)
+        with pool.transaction(immediate=True) as conn:
+            found = _complete_many(conn, todo_ids)
+        summary = _summary(_id_results(todo_ids, found))
+        if summary["succeeded"]:
+            _todos_changed()
+        return summary
+    except Exception as e:
+        return {"error": f"Error: {str(e)}"}
+
+@mcp.tool()
+def delete_todos(todo_ids: list[int]) -> dict:
+    """Delete many todo items in a single transaction.
+
+    Args:
+        todo_ids: IDs of the todo items to delete.
+    """
+    try:
+        _check_batch(todo_ids)
+        with pool.transaction(immediate=True) as conn:
+            found = _delete_many(conn, todo_ids)
+        summary = _summary(_id_results(todo_ids, found, once=True))
+        if summary["succeeded"]:
+            _todos_changed()
+        return summary
+    except Exception as e:
+        return {"error": f"Error: {str(e)}"}
+
+@mcp.tool()
+def apply_todo_ops(ops: list[dict]) -> dict:
+    """Apply a mixed list of add / complete / delete ops in a single transaction.
+
+    Each op is {"op": "add", "title": ...}, {"op": "complete", "id": ...}
+    or {"op": "delete", "id": ...}. Ops run in order; consecutive ops of the
+    same kind are sent to SQLite as one executemany. Either every op is
+    applied or, on a database error, none is.
+
+    Args:
+        ops: The operations to apply.
+    """
+    try:
+        _check_batch(ops)
+        results = [None] * len(ops)
+        runs = []                                   # [(kind, [(index, value), ...]), ...]
+        for index, op in enumerate(ops):
+            kind = op.get("op")
+            value = op.get("title") if kind == "add" else op.get("id")
+            if kind not in ("add", "complete", "delete"):
+                results[index] = {"op": kind, "ok": False, "error": "op must be add, complete or delete"}
+            elif (kind == "add" and not isinstance(value, str)) or \
+                    (kind != "add" and (not isinstance(value, int) or isinstance(value, bool))):
+                field = "title" if kind == "add" else "id"
+                results[index] = {"op": kind, "ok": False, "error": f"missing or invalid '{field}'"}
+            elif runs and runs[-1][0] == kind:
+                runs[-1][1].append((index, value))
+            else:
+                runs.append((kind, [(index, value)]))
+
+        with pool.transaction(immediate=True) as conn:
+            for kind, items in runs:
+                values = [value for _, value in items]
+                if kind == "add":
+                    for (index, title), new_id in zip(items, _insert_many(conn, values)):
+                        results[index] = {"op": kind, "id": new_id, "title": title, "ok": True}
+                    continue
+                found = (_complete_many if kind == "complete" else _delete_many)(conn, values)
+                for (index, _), result in zip(items, _id_results(values, found, once=kind == "delete")):
+                    results[index] = {"op": kind, **result}
+        summary = _summary(results)
+        if summary["succeeded"]:
+            _todos_changed()
+        return summary
+    except Exception as e:
+        return {"error": f"Error: {str(e)}"}
+
+def _fts_query(text: str, prefix: bool) -> str:
+    """Turn plain words into an FTS5 query: every word must match, quoted so
+    characters like '-' or ':' aren't read as FTS syntax."""
+    terms = ['"' + word.replace('"', '""') + '"' + ("*" if prefix else "")
+             for word in text.split()]
+    return " AND ".join(terms)
+
+@mcp.tool()
+def search_todos(query: str, limit: int = 20, prefix: bool = True,
+                 completed: bool | None = None) -> dict:
+    """Search todo titles by keyword, best matches first.
+
+    Args:
+        query: Words to look for; every word must appear in the title.
+        limit: Maximum number of results.
+        prefix: Also match words that start with each term ("mil" finds "milk").
+        completed: Only return completed (true) or open (false) todos.
+    """
+    try:
+        match = _fts_query(query, prefix)
+        if not match:
+            raise ValueError("query must contain at least one word")
+        sql = ('SELECT t.id, t.title, t.completed, f.rank FROM todos_fts AS f '
+               'JOIN todos AS t ON t.id = f.rowid WHERE todos_fts MATCH ?')
+        params = [match]
+        if completed is not None:
+            sql += ' AND t.completed = ?'
+            params.append(int(completed))
+        sql += ' ORDER BY f.rank LIMIT ?'
+        params.append(max(1, min(limit, SEARCH_MAX_RESULTS)))
+        with pool.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return {
+            "query": query,
+            "results": [{"id": r["id"], "title": r["title"], "completed": bool(r["completed"]),
+                         "score": round(-r["rank"], 4)} for r in rows],
+        }
+    except Exception as e:
+        return {"error": f"Error: {str(e)}"}
+
 if __name__ == "__main__":
     mcp.run()
@@ -1,6 +1,8 @@
+import argparse
 import asyncio
 from fastmcp import Client
 
+from pooled_client import PooledClient
 
 
 async def main():
@@ -14,7 +16,26 @@ async def main():
         print(f"Server response: {result.content[0].text}, \n\n{result.structured_content}")
 
 
+async def fan_out(calls: int, max_in_flight: int):
+    # Server started with: python mcp_server.py --transport http
+    async with PooledClient("http://127.0.0.1:8000/mcp", max_in_flight=max_in_flight) as client:
+        tools = await client.list_tools()
+        print(f"Available tools: {[t.name for t in tools]}")
+
+        results = await client.call_many([("say_hello", {"name": f"Agent-{i}"}) for i in range(calls)])
+        failed = [r for r in results if isinstance(r, Exception)]
+        print(f"{calls - len(failed)}/{calls} calls ok, e.g. {results[0].content[0].text if not failed else failed[0]}")
+        print(f"Latency (ms): { {k: round(v, 1) for k, v in client.stats().items()} }")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transport", choices=["sse", "http"], default="sse")
+    parser.add_argument("--calls", type=int, default=200, help="http only: concurrent say_hello calls")
+    parser.add_argument("--max-in-flight", type=int, default=16, help="http only")
+    args = parser.parse_args()
+
+    if args.transport == "sse":
+        asyncio.run(main())
+    else:
+        asyncio.run(fan_out(args.calls, args.max_in_flight))
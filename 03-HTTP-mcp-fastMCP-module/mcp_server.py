@@ -1,4 +1,17 @@
+import argparse
+import gzip
+import json
+import os
+import socket
+
 from fastmcp import FastMCP
+from starlette.middleware import Middleware
+from uvicorn.protocols.http.h11_impl import H11Protocol
+
+try:
+    import zstandard
+except ImportError:           # optional: without it responses are gzip-only
+    zstandard = None
 
 mcp = FastMCP("My-HTTP-Server")
 
@@ -7,5 +20,160 @@ def say_hello(name: str) -> str:
     """A simple tool to greet a user."""
     return f"Hello, {name}! This response came via HTTP."
 
+# --- Streamable HTTP, many workers ---
+# Worker processes re-import this module, so settings travel as env vars.
+
+MAX_IN_FLIGHT = int(os.environ.get("MCP_MAX_IN_FLIGHT", "256"))      # per worker process
+DRAIN_TIMEOUT = float(os.environ.get("MCP_DRAIN_TIMEOUT", "30"))     # seconds to finish in-flight work on shutdown
+COMPRESS_MIN_BYTES = 1024                                             # smaller bodies aren't worth compressing
+
+BUSY_BODY = json.dumps({"jsonrpc": "2.0", "id": None,
+                        "error": {"code": -32000, "message": "Server busy, retry shortly"}}).encode()
+
+
+class InFlightLimit:
+    """ASGI middleware: at most `limit` HTTP requests inside the app at once.
+
+    Past that, answer 503 + Retry-After straight away instead of letting work
+    pile up. Counts requests, not connections, so idle keep-alive
+    connections from pooled clients don't use up the budget.
+    """
+
+    def __init__(self, app, limit: int):
+        self.app = app
+        self.limit = limit
+        self.active = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        if self.active >= self.limit:
+            await send({"type": "http.response.start", "status": 503,
+                        "headers": [(b"content-type", b"application/json"), (b"retry-after", b"1")]})
+            await send({"type": "http.response.body", "body": BUSY_BODY})
+            return
+        self.active += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.active -= 1
+
+
+class Compress:
+    """ASGI middleware: zstd or gzip for large one-piece response bodies.
+
+    Picks zstd when the client accepts it and `zstandard` is installed, else
+    gzip. Only bodies sent in one message are touched (json_response mode);
+    streamed responses (SSE) pass through unchanged.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accepted = {part.split(";")[0].strip()
+                    for name, value in scope["headers"] if name == b"accept-encoding"
+                    for part in value.decode("latin-1").split(",")}
+        if zstandard is not None and "zstd" in accepted:
+            encoding = "zstd"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+        else:
+            return await self.app(scope, receive, send)
+
+        start = None
+
+        async def compressing_send(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message                       # hold until we see the body
+                return
+            if start is not None:
+                held, start = start, None
+                headers = [(k, v) for k, v in held["headers"] if k != b"content-length"]
+                body = message.get("body", b"")
+                if (message.get("more_body") or len(body) < self.minimum_size
+                        or any(k == b"content-encoding" for k, _ in headers)):
+                    await send(held)                  # streamed, small or already encoded
+                    return await send(message)
+                if encoding == "zstd":
+                    body = zstandard.ZstdCompressor(level=3).compress(body)
+                else:
+                    body = gzip.compress(body, compresslevel=5)
+                headers += [(b"content-encoding", encoding.encode()), (b"vary", b"accept-encoding"),
+                            (b"content-length", str(len(body)).encode())]
+                await send({**held, "headers": headers})
+                return await send({**message, "body": body})
+            await send(message)
+
+        await self.app(scope, receive, compressing_send)
+
+
+class NoDelayH11Protocol(H11Protocol):
+    """uvicorn's h11 protocol with TCP_NODELAY on every connection.
+
+    With --workers, uvicorn binds the listening socket itself with proto=0,
+    and asyncio only turns Nagle off for sockets whose proto is IPPROTO_TCP.
+    Left on, every keep-alive response stalls ~40 ms on delayed ACKs.
+    """
+
+    def connection_made(self, transport):
+        sock = transport.get_extra_info("socket")
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        super().connection_made(transport)
+
+
+def create_http_app():
+    """ASGI app for one worker: stateless streamable HTTP at /mcp.
+
+    stateless_http: no session kept between requests, so ANY worker can answer
+    ANY request — no sticky routing needed across processes.
+    json_response: each POST gets a plain JSON reply instead of opening an SSE stream.
+    """
+    return mcp.http_app(
+        transport="http",
+        stateless_http=True,
+        json_response=True,
+        middleware=[Middleware(InFlightLimit, limit=MAX_IN_FLIGHT), Middleware(Compress)],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="My-HTTP-Server")
+    parser.add_argument("--transport", choices=["sse", "http"], default="sse",
+                        help="sse: one process, /sse (original). http: stateless streamable HTTP, /mcp")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="http only: worker processes")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT, help="http only: per worker")
+    parser.add_argument("--drain-timeout", type=float, default=DRAIN_TIMEOUT, help="http only: seconds")
+    args = parser.parse_args()
+
+    if args.transport == "sse":
+        mcp.run(transport="sse", host=args.host, port=args.port)
+        return
+
+    import uvicorn
+    os.environ["MCP_MAX_IN_FLIGHT"] = str(args.max_in_flight)
+    # All workers share one listening socket; the kernel spreads connections across them.
+    # On SIGINT/SIGTERM uvicorn stops accepting, lets in-flight requests finish for up
+    # to --drain-timeout seconds, then closes.
+    uvicorn.run(
+        "mcp_server:create_http_app",
+        factory=True,
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        http=NoDelayH11Protocol,
+        timeout_graceful_shutdown=args.drain_timeout,
+        log_level="warning",
+    )
+
+
 if __name__ == "__main__":
-    mcp.run(transport="sse", host="127.0.0.1", port=8000)
\ No newline at end of file
+    main()
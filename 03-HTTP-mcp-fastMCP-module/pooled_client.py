@@ -0,0 +1,96 @@
+import asyncio
+import time
+from collections import deque
+
+import httpx
+from fastmcp import Client
+from fastmcp.client.transports import StreamableHttpTransport
+
+try:
+    import zstandard  # noqa: F401  (httpx decodes zstd only when this is installed)
+    ACCEPT_ENCODING = "zstd, gzip"
+except ImportError:
+    ACCEPT_ENCODING = "gzip"
+
+
+class PooledClient:
+    """One long-lived MCP client for many concurrent tool calls.
+
+    - one session + one httpx connection pool for the client's whole life:
+      keep-alive connections are reused, no TCP/TLS setup per call
+    - asks for zstd/gzip, so large tool results come back compressed
+      (httpx decompresses transparently)
+    - `call_tool()` can be awaited from many tasks at once; the requests go
+      out concurrently, at most `max_in_flight` at a time
+    - every call's latency is recorded; `stats()` summarises them
+
+        async with PooledClient("http://127.0.0.1:8000/mcp") as client:
+            results = await client.call_many([("say_hello", {"name": n}) for n in names])
+            print(client.stats())
+    """
+
+    def __init__(self, url: str, max_connections: int = 32, max_in_flight: int = 64,
+                 timeout: float = 30.0, keep_latencies: int = 10_000):
+        self.url = url
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_connections,
+                                   keepalive_expiry=60)
+        self.timeout = timeout
+        self.latencies = deque(maxlen=keep_latencies)   # (tool name, seconds, ok)
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._client = None
+
+    def _http_client(self, headers=None, auth=None, timeout=None, **kwargs) -> httpx.AsyncClient:
+        # called by the transport once per session; our pool settings win
+        return httpx.AsyncClient(
+            headers={**(headers or {}), "Accept-Encoding": ACCEPT_ENCODING},
+            auth=auth,
+            timeout=timeout or httpx.Timeout(self.timeout),
+            limits=self.limits,
+            **kwargs,
+        )
+
+    async def __aenter__(self):
+        transport = StreamableHttpTransport(self.url, httpx_client_factory=self._http_client)
+        self._client = Client(transport)
+        await self._client.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.__aexit__(*exc)
+        self._client = None
+
+    async def list_tools(self):
+        return await self._client.list_tools()
+
+    async def call_tool(self, name: str, arguments: dict | None = None):
+        async with self._in_flight:
+            start = time.perf_counter()
+            ok = False
+            try:
+                result = await self._client.call_tool(name, arguments or {})
+                ok = True
+                return result
+            finally:
+                self.latencies.append((name, time.perf_counter() - start, ok))
+
+    async def call_many(self, calls: list[tuple[str, dict]]) -> list:
+        """Run all calls concurrently; results in input order, exceptions returned in place."""
+        return await asyncio.gather(*(self.call_tool(name, args) for name, args in calls),
+                                    return_exceptions=True)
+
+    def stats(self) -> dict:
+        if not self.latencies:
+            return {"calls": 0}
+        ms = sorted(seconds * 1000 for _, seconds, _ in self.latencies)
+
+        def pct(p):
+            return ms[min(len(ms) - 1, round(p * (len(ms) - 1)))]
+        return {
+            "calls": len(ms),
+            "errors": sum(1 for _, _, ok in self.latencies if not ok),
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": ms[-1],
+        }
@@ -0,0 +1,320 @@
+"""Benchmark every MCP server in this repo over its real transport.
+
+For each server: start it locally, time spawn -> initialize, then run each
+tool's workload (`--requests` calls, `--concurrency` at a time, on one
+session) and record per-tool throughput and p50/p95/p99 latency, plus the
+server's memory (all of its processes) afterwards. Results are saved as JSON
+named after the current commit, so two commits can be compared:
+
+    python benchmarks/bench_servers.py                         # all servers
+    python benchmarks/bench_servers.py --servers todo,http -c 16 -n 500
+    python benchmarks/bench_servers.py --compare benchmarks/results/<old>.json
+
+Servers run from a scratch directory (their databases and indexes go there),
+so the tracked files in this repo are never touched.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+# --- What to run ---
+# workload(scratch_dir) -> [(tool, arguments), ...]; each tool is measured on its own.
+
+def _file_server_workload(scratch: str) -> list:
+    data = os.path.join(scratch, "files")
+    os.makedirs(data, exist_ok=True)
+    for i in range(50):
+        with open(os.path.join(data, f"doc{i}.txt"), "w") as f:
+            f.write(f"line {i} of the benchmark corpus, needle{i % 5}\n" * 200)
+    return [
+        ("read_file", {"path": os.path.join(data, "doc0.txt")}),
+        ("list_files", {"directory": data}),
+        ("search_files", {"query": "needle3", "directory": data}),
+    ]
+
+SERVERS = {
+    "system-info": {
+        "transport": "stdio",
+        "script": "01-stdio-mcp-FastMCP-module/mcp_server.py",
+        "workload": lambda scratch: [
+            ("echo", {"message": "ping"}),
+            ("get_system_info", {}),
+        ],
+    },
+    "local-test-mcp-sever": {
+        "transport": "stdio",
+        "script": "01-stdio-mcp-server-module/mcp_server.py",
+        "workload": lambda scratch: [
+            ("add_numbers", {"a": 2, "b": 3}),
+            ("reduce_numbers", {"op": "sum", "values": list(range(1000))}),
+            ("get_status", {}),
+        ],
+    },
+    "FileSystemAssistant": {
+        "transport": "stdio",
+        "script": "02-fastmcp-local-file-server/server.py",
+        "env": lambda scratch: {"FS_INDEX_DIR": os.path.join(scratch, "index")},
+        "workload": _file_server_workload,
+    },
+    "sqlite-todo": {
+        "transport": "stdio",
+        "script": "02-fastmcp-todo-sqlit/server.py",
+        "workload": lambda scratch: [
+            ("add_todo", {"title": "benchmark todo"}),
+            ("search_todos", {"query": "bench"}),
+        ],
+    },
+    "My-HTTP-Server (sse)": {
+        "transport": "sse",
+        "script": "03-HTTP-mcp-fastMCP-module/mcp_server.py",
+        "args": lambda port: ["--port", str(port)],
+        "url": "http://127.0.0.1:{port}/sse",
+        "workload": lambda scratch: [("say_hello", {"name": "bench"})],
+    },
+    "My-HTTP-Server (http)": {
+        "transport": "http",
+        "script": "03-HTTP-mcp-fastMCP-module/mcp_server.py",
+        "args": lambda port: ["--transport", "http", "--workers", "2", "--port", str(port)],
+        "url": "http://127.0.0.1:{port}/mcp",
+        "workload": lambda scratch: [("say_hello", {"name": "bench"})],
+    },
+}
+ALIASES = {"sysinfo": "system-info", "lowlevel": "local-test-mcp-sever", "files": "FileSystemAssistant",
+           "todo": "sqlite-todo", "sse": "My-HTTP-Server (sse)", "http": "My-HTTP-Server (http)"}
+
+
+# --- Memory (Linux /proc; None elsewhere) ---
+
+def _children() -> dict[int, list[int]]:
+    tree = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            tree.setdefault(ppid, []).append(int(entry))
+    return tree
+
+def server_memory() -> dict | None:
+    """RSS now and peak RSS, summed over every process this harness started."""
+    if not os.path.isdir("/proc"):
+        return None
+    tree = _children()
+    stack, totals = list(tree.get(os.getpid(), [])), {"VmRSS": 0, "VmHWM": 0}
+    while stack:
+        pid = stack.pop()
+        stack.extend(tree.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    key = line.split(":")[0]
+                    if key in totals:
+                        totals[key] += int(line.split()[1])      # kB
+        except OSError:
+            continue
+    return {"rss_mb": round(totals["VmRSS"] / 1024, 1), "peak_rss_mb": round(totals["VmHWM"] / 1024, 1)}
+
+
+# --- Connecting ---
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def _wait_for_port(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise TimeoutError(f"server did not listen on port {port} within {timeout:g}s")
+
+@asynccontextmanager
+async def open_session(spec: dict, scratch: str):
+    """Start the server, yield (initialized session, startup seconds)."""
+    script = os.path.join(ROOT, spec["script"])
+    env = {**os.environ, **spec.get("env", lambda s: {})(scratch)}
+    start = time.perf_counter()
+
+    if spec["transport"] == "stdio":
+        params = StdioServerParameters(command=sys.executable, args=[script], cwd=scratch, env=env)
+        with open(os.path.join(scratch, "server.log"), "w") as log:      # keep server logging off our output
+            async with stdio_client(params, errlog=log) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    yield session, time.perf_counter() - start
+        return
+
+    port = _free_port()
+    proc = subprocess.Popen([sys.executable, script, *spec["args"](port)], cwd=scratch, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        await _wait_for_port(port)
+        url = spec["url"].format(port=port)
+        client = sse_client(url) if spec["transport"] == "sse" else streamablehttp_client(url)
+        async with client as streams:
+            async with ClientSession(streams[0], streams[1]) as session:
+                await session.initialize()
+                yield session, time.perf_counter() - start
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+# --- Measuring ---
+
+def _percentile(ms: list[float], p: float) -> float:
+    return ms[min(len(ms) - 1, round(p * (len(ms) - 1)))]
+
+async def run_tool(session: ClientSession, tool: str, args: dict, requests: int,
+                   concurrency: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        await session.call_tool(tool, args)
+
+    latencies, errors, remaining = [], 0, requests
+
+    async def worker():
+        nonlocal errors, remaining
+        while remaining > 0:
+            remaining -= 1
+            t = time.perf_counter()
+            try:
+                result = await session.call_tool(tool, args)
+                errors += bool(result.isError)
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - t) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    ms = sorted(latencies)
+    return {
+        "calls": len(ms),
+        "errors": errors,
+        "throughput_rps": round(len(ms) / elapsed, 1),
+        "p50_ms": round(_percentile(ms, 0.50), 3),
+        "p95_ms": round(_percentile(ms, 0.95), 3),
+        "p99_ms": round(_percentile(ms, 0.99), 3),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "max_ms": round(ms[-1], 3),
+    }
+
+async def bench_server(name: str, spec: dict, args) -> dict:
+    with tempfile.TemporaryDirectory(prefix="mcp-bench-") as scratch:
+        workload = spec["workload"](scratch)
+        result = {"server": name, "transport": spec["transport"], "tools": {}}
+        try:
+            async with open_session(spec, scratch) as (session, startup):
+                result["startup_ms"] = round(startup * 1000, 1)
+                for tool, tool_args in workload:
+                    result["tools"][tool] = await run_tool(session, tool, tool_args, args.requests,
+                                                           args.concurrency, args.warmup)
+                    print(f"  {tool:<16} {result['tools'][tool]}", flush=True)
+                result["memory"] = server_memory()
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            print(f"  failed: {result['error']}", flush=True)
+        return result
+
+
+# --- Saving / comparing ---
+
+def _git(*cmd) -> str:
+    try:
+        return subprocess.run(["git", *cmd], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def compare(old: dict, new: dict):
+    before = {(r["server"], tool): stats for r in old["results"] for tool, stats in r.get("tools", {}).items()}
+    print(f"\nvs {old['meta'].get('commit') or 'baseline'}:")
+    print(f"{'server / tool':<44} {'p50 ms':>16} {'p95 ms':>16} {'rps':>16}")
+    for r in new["results"]:
+        for tool, stats in r.get("tools", {}).items():
+            prev = before.get((r["server"], tool))
+            if prev is None:
+                continue
+            cells = []
+            for key in ("p50_ms", "p95_ms", "throughput_rps"):
+                change = (stats[key] - prev[key]) / prev[key] * 100 if prev[key] else 0.0
+                cells.append(f"{stats[key]:>8.2f} {change:+6.1f}%")
+            print(f"{r['server'] + ' / ' + tool:<44} " + " ".join(cells))
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MCP servers in this repo")
+    parser.add_argument("--servers", default="all",
+                        help=f"comma-separated names or aliases ({', '.join(ALIASES)}), default: all")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="calls in flight per tool")
+    parser.add_argument("-n", "--requests", type=int, default=200, help="measured calls per tool")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured calls per tool first")
+    parser.add_argument("-o", "--output", help="JSON file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    names = list(SERVERS) if args.servers == "all" else [ALIASES.get(s.strip(), s.strip())
+                                                          for s in args.servers.split(",")]
+    unknown = [n for n in names if n not in SERVERS]
+    if unknown:
+        parser.error(f"unknown server(s): {', '.join(unknown)}")
+
+    commit = _git("rev-parse", "--short", "HEAD")
+    dirty = bool(_git("status", "--porcelain", "--untracked-files=no"))
+    report = {
+        "meta": {
+            "commit": commit + ("-dirty" if dirty else ""),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+        },
+        "results": [],
+    }
+    for name in names:
+        print(f"{name} ({SERVERS[name]['transport']})", flush=True)
+        report["results"].append(await bench_server(name, SERVERS[name], args))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['meta']['commit'] or 'results'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())